@@ -74,6 +74,10 @@ class Company(User):
 
 class JobPosting(db.Model):
     __tablename__ = 'job_postings'
+    __table_args__ = (
+        # Salary range filters are index range scans on the parsed bounds
+        db.Index('ix_job_postings_salary_range', 'salary_min', 'salary_max'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     company_id = db.Column(db.Integer, db.ForeignKey('companies.id'), nullable=False)
     admin_id = db.Column(db.Integer, db.ForeignKey('admins.id'))
@@ -95,9 +99,53 @@ class JobPosting(db.Model):
     applications = db.relationship('Application', backref='job_posting', lazy=True)
     recommendations = db.relationship('Recommendation', backref='job_posting', lazy=True)
     
+    def to_recommender_row(self):
+        """Plain dict of the fields the job recommender uses"""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'category': self.category,
+            'subcategory': self.subcategory,
+            'role': self.role,
+            'location': self.location,
+            'company_name': self.company.name,
+            'qualification': self.qualification,
+            'salary': self.salary,
+            'salary_min': self.salary_min,
+            'salary_max': self.salary_max,
+            'job_type': self.job_type,
+            'is_active': self.is_active
+        }
+    
     def __repr__(self):
         return f"JobPosting('{self.title}', '{self.company.name}')"
 
+class ProcessedJobText(db.Model):
+    __tablename__ = 'processed_job_texts'
+    job_id = db.Column(db.Integer, db.ForeignKey('job_postings.id', ondelete='CASCADE'), primary_key=True)
+    content_hash = db.Column(db.String(40), nullable=False)  # Hash of the raw fields below
+    title = db.Column(db.Text)
+    description = db.Column(db.Text)
+    category = db.Column(db.Text)
+    role = db.Column(db.Text)
+    qualification = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"ProcessedJobText('{self.job_id}', '{self.content_hash}')"
+
+class JobNeighbor(db.Model):
+    __tablename__ = 'job_neighbors'
+    job_id = db.Column(db.Integer, db.ForeignKey('job_postings.id', ondelete='CASCADE'), primary_key=True)
+    rank = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)  # 0 = most similar
+    neighbor_id = db.Column(db.Integer, db.ForeignKey('job_postings.id', ondelete='CASCADE'),
+                            nullable=False, index=True)
+    score = db.Column(db.Float, nullable=False)  # Cosine similarity of the TF-IDF rows
+    
+    def __repr__(self):
+        return f"JobNeighbor('{self.job_id}', '{self.neighbor_id}', '{self.score}')"
+
 class Application(db.Model):
     __tablename__ = 'applications'
     id = db.Column(db.Integer, primary_key=True)
@@ -115,6 +163,7 @@ class Recommendation(db.Model):
     graduate_id = db.Column(db.Integer, db.ForeignKey('graduates.id'), nullable=False)
     job_id = db.Column(db.Integer, db.ForeignKey('job_postings.id'), nullable=False)
     match_score = db.Column(db.Float, nullable=False)
+    matching_terms = db.Column(db.String(255))  # Comma-separated terms the profile and job share, best first
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def __repr__(self):
@@ -148,4 +197,14 @@ class SUSEvaluation(db.Model):
         return (odd_sum + even_sum) * 2.5
     
     def __repr__(self):
-        return f"SUSEvaluation(User: '{self.user.email}', Score: '{self.calculate_score()}')"
\ No newline at end of file
+        return f"SUSEvaluation(User: '{self.user.email}', Score: '{self.calculate_score()}')"
+
+class CorpusVersion(db.Model):
+    __tablename__ = 'corpus_versions'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)  # e.g. 'jobs'
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"CorpusVersion('{self.name}', '{self.version}')"
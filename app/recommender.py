@@ -1,157 +1,1629 @@
 # Job recommendation engine
+import copy
+import itertools
+import json
+import os
+import pickle
 import re
+import shutil
+import tempfile
+from collections import Counter
+from functools import partial
 import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
-
-# Download necessary NLTK resources if not already available
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/stopwords')
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('stopwords')
-    nltk.download('wordnet')
+import scipy.sparse as sp
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+from app.salary import parse_salary
+from app.text_processing import content_hash, get_normalizer, normalize_rows_parallel, whitespace_tokenize
+
+# Relative importance of each job field in the job vector
+FIELD_WEIGHTS = {
+    'title': 3.0,             # Job title is very important
+    'description': 2.0,       # Job description contains detailed requirements
+    'category': 1.5,          # Category provides general field
+    'role': 2.0,              # Role indicates position level
+    'qualification': 2.5      # Qualifications are key for matching
+}
+
+# Job fields that are preprocessed and vectorized
+TEXT_FIELDS = list(FIELD_WEIGHTS)
+
+# Vectorizer engines: per-field vocabularies, or vocabulary-free feature hashing
+ENGINES = ('tfidf', 'hashing')
+
+# Hashed columns per field for the hashing engine
+HASHING_FEATURES = 2 ** 18
+
+# Version of the on-disk layout written by JobRecommender.save()
+MODEL_FORMAT = 4
+
+# Every change to a fitted model gets a new process-wide version, so cached
+# profile vectors never outlive the vectorizer state that produced them
+_model_versions = itertools.count(1)
+
+# Upper bound on the dense score block (profiles x jobs) materialized per batch chunk
+MAX_SCORE_CELLS = 2 ** 24
+
+# Corpus size from which single queries go through the inverted index. Off by
+# default: on our benchmarks (scripts/benchmark_recommender.py retrieval) the
+# exhaustive sparse matvec is still faster up to 300k postings
+INVERTED_INDEX_MIN_JOBS = None
+
+# Storage types for the job rows: float32 halves the float64 index, uint8
+# quantizes every row's weights to 0..255 with a float32 scale per row
+INDEX_DTYPES = ('float64', 'float32', 'uint8')
+
+# Distinct terms per field a streaming fit counts before dropping the rarest ones
+# (about 130 bytes each, so ~35 MB per field; 25x the max_features vocabulary)
+STREAM_MAX_TERMS = 250000
+
+def top_k_indices(scores, k):
+    """Indices of the k highest scores along the last axis, best first
+
+    Uses argpartition so only the selected k entries are sorted.
+    """
+    n = scores.shape[-1]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.intp)
+    
+    if k < n:
+        top = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        top = np.broadcast_to(np.arange(n), scores.shape).copy()
+    order = np.argsort(-np.take_along_axis(scores, top, axis=-1), axis=-1, kind='stable')
+    return np.take_along_axis(top, order, axis=-1)
+
+def job_row_index(job_ids):
+    """Dense job id -> row array (-1 for ids without a row), for O(1) lookups"""
+    job_ids = np.asarray(job_ids, dtype=np.int64)
+    rows = np.full(int(job_ids.max()) + 1 if len(job_ids) else 0, -1, dtype=np.int64)
+    rows[job_ids] = np.arange(len(job_ids))
+    return rows
+
+def make_tfidf_vectorizer():
+    """TF-IDF vectorizer for one field of already normalized text"""
+    # Features are already normalized, so the vectorizer only splits on whitespace
+    return TfidfVectorizer(
+        max_features=10000,
+        ngram_range=(1, 2),
+        min_df=1,
+        max_df=0.85,
+        sublinear_tf=True,
+        lowercase=False,
+        tokenizer=whitespace_tokenize,
+        token_pattern=None
+    )
+
+def compact_rows(matrix, dtype='float32', max_terms=None):
+    """(rows, scales): weighted job rows in a smaller index representation
+    
+    With max_terms only each row's max_terms heaviest weights are kept and the
+    row is L2-normalized again. With dtype uint8 weights are quantized per row
+    and scales holds the multiplier that restores them (None for float dtypes).
+    """
+    if dtype not in INDEX_DTYPES:
+        raise ValueError(f"Unknown index dtype {dtype!r}, expected one of {INDEX_DTYPES}")
+    matrix = matrix.tocsr()
+    row_ids = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    
+    if max_terms is not None and matrix.nnz:
+        # Rank entries within each row by weight and keep the top max_terms
+        order = np.lexsort((-matrix.data, row_ids))
+        rank = np.arange(matrix.nnz) - matrix.indptr[row_ids[order]]
+        keep = np.zeros(matrix.nnz, dtype=bool)
+        keep[order[rank < max_terms]] = True
+        
+        indptr = np.zeros(matrix.shape[0] + 1, dtype=matrix.indptr.dtype)
+        indptr[1:] = np.cumsum(np.bincount(row_ids[keep], minlength=matrix.shape[0]))
+        matrix = normalize(sp.csr_matrix((matrix.data[keep], matrix.indices[keep], indptr), shape=matrix.shape))
+        row_ids = row_ids[keep]
+    
+    if dtype != 'uint8':
+        return matrix.astype(dtype), None
+    
+    row_max = np.zeros(matrix.shape[0])
+    np.maximum.at(row_max, row_ids, matrix.data)
+    scales = (row_max / 255).astype(np.float32)
+    divisors = np.where(scales > 0, scales, 1)[row_ids]
+    # Weights under half a step round up to 1 rather than 0, so every row keeps
+    # its term set and removing the posting later subtracts all its document frequencies
+    data = np.maximum(np.rint(matrix.data / divisors), 1).astype(np.uint8)
+    quantized = sp.csr_matrix((data, matrix.indices.copy(), matrix.indptr.copy()), shape=matrix.shape)
+    return quantized, scales
+
+def _rank_within_groups(groups, values):
+    """Rank of every value among those of its group, 0 being the largest"""
+    order = np.lexsort((-values, groups))
+    ordered_groups = groups[order]
+    rank = np.empty(len(values), dtype=np.int64)
+    rank[order] = np.arange(len(values)) - np.searchsorted(ordered_groups, ordered_groups)
+    return rank
+
+def location_key(location):
+    """Normalized location for exact matching: lowercase words joined by single spaces
+
+    "Kuala Lumpur", " kuala  lumpur " and "Kuala-Lumpur" share one key.
+    """
+    if not isinstance(location, str):
+        return ''
+    return ' '.join(re.findall(r'[a-z0-9]+', location.lower()))
+
+def smoothed_idf(doc_freq, n_docs):
+    """Smoothed IDF, the formula TfidfVectorizer uses during fit"""
+    return np.log((1 + n_docs) / (1 + doc_freq)) + 1
+
+def tfidf_weight(counts, idf):
+    """L2-normalized sublinear TF-IDF rows from raw counts, as TfidfVectorizer weights them"""
+    counts = counts.astype(np.float64)
+    counts.data = np.log(counts.data) + 1
+    weighted = counts.multiply(idf).tocsr()
+    weighted.eliminate_zeros()
+    return normalize(weighted)
+
+class HashingTfidfVectorizer:
+    """Vocabulary-free TF-IDF for one field of already normalized text
+    
+    Terms are hashed into n_features columns, so postings can be vectorized as
+    they arrive without a fitted vocabulary; IDF comes from document frequencies
+    counted per column. Columns no document uses get zero IDF, so terms unseen
+    in the corpus do not count in a query's norm.
+    """
+    
+    def __init__(self, n_features=HASHING_FEATURES):
+        self.n_features = n_features
+        self.hasher = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm=None,
+            lowercase=False,
+            tokenizer=whitespace_tokenize,
+            token_pattern=None
+        )
+        self.doc_freq_ = np.zeros(n_features, dtype=np.int64)
+        self.n_docs_ = 0
+    
+    @property
+    def idf_(self):
+        idf = smoothed_idf(self.doc_freq_, self.n_docs_)
+        idf[self.doc_freq_ == 0] = 0
+        return idf
+    
+    def count(self, texts):
+        """Raw hashed term counts"""
+        return self.hasher.transform(texts)
+    
+    def partial_fit(self, texts):
+        """Add documents to the document frequencies"""
+        counts = self.count(texts)
+        self.doc_freq_ = self.doc_freq_ + np.bincount(counts.indices, minlength=self.n_features)
+        self.n_docs_ += counts.shape[0]
+        return self
+    
+    def fit_transform(self, texts):
+        self.doc_freq_ = np.zeros(self.n_features, dtype=np.int64)
+        self.n_docs_ = 0
+        return self.partial_fit(texts).transform(texts)
+    
+    def transform(self, texts):
+        return tfidf_weight(self.count(texts), self.idf_)
+    
+    def get_feature_names_out(self):
+        """Hashed columns have no terms; name them by bucket"""
+        return np.array([f"#{column}" for column in range(self.n_features)], dtype=object)
+
+class CompactTfidfVectorizer:
+    """Read-only stand-in for a fitted field TfidfVectorizer, restored from saved arrays
+    
+    Terms are one UTF-8 blob with per-column offsets instead of a vocabulary dict,
+    so a memory-mapped model shares them between processes. A fitted vocabulary
+    is sorted by term, so lookups are searches over the terms' 8-byte prefixes,
+    finished with a binary search over the blob where prefixes collide. Tokenizes
+    and weights text exactly like make_tfidf_vectorizer().
+    """
+    
+    PREFIX_BYTES = 8
+    
+    def __init__(self, blob, offsets, idf):
+        # Plain array views of memory-mapped files: np.memmap indexing is much slower
+        self.blob = np.asarray(blob)
+        self.offsets = np.asarray(offsets)
+        self.idf_ = idf
+        self._prefixes = None
+    
+    @property
+    def n_terms(self):
+        return len(self.offsets) - 1
+    
+    def _term_bytes(self, column):
+        return self.blob[self.offsets[column]:self.offsets[column + 1]].tobytes()
+    
+    @classmethod
+    def _prefix(cls, key):
+        return int.from_bytes(key[:cls.PREFIX_BYTES].ljust(cls.PREFIX_BYTES, b'\0'), 'big')
+    
+    @property
+    def prefixes(self):
+        """Big-endian integer of every term's first bytes (null padded), in column order"""
+        if self._prefixes is None:
+            starts, ends = self.offsets[:-1], self.offsets[1:]
+            positions = starts[:, None] + np.arange(self.PREFIX_BYTES)
+            inside = positions < ends[:, None]
+            prefix_bytes = np.where(inside, self.blob[np.minimum(positions, max(len(self.blob) - 1, 0))], 0)
+            self._prefixes = np.ascontiguousarray(prefix_bytes.astype(np.uint8)).view('>u8').ravel()
+        return self._prefixes
+    
+    def columns(self, terms):
+        """Column of every term, None for terms not in the vocabulary"""
+        if not terms or not self.n_terms:
+            return [None] * len(terms)
+        
+        keys = [term.encode('utf-8') for term in terms]
+        key_prefixes = np.array([self._prefix(key) for key in keys], dtype=np.uint64)
+        lows = np.searchsorted(self.prefixes, key_prefixes, side='left')
+        highs = np.searchsorted(self.prefixes, key_prefixes, side='right')
+        
+        columns = []
+        for key, low, high in zip(keys, lows.tolist(), highs.tolist()):
+            # Terms sharing the prefix are still sorted: bisect among them
+            while low < high:
+                middle = (low + high) // 2
+                if self._term_bytes(middle) < key:
+                    low = middle + 1
+                else:
+                    high = middle
+            found = low < self.n_terms and self._term_bytes(low) == key
+            columns.append(low if found else None)
+        return columns
+    
+    @staticmethod
+    def analyze(text):
+        """Unigrams then bigrams, as the (1, 2) ngram_range analyzer produces them"""
+        tokens = whitespace_tokenize(text)
+        return tokens + [' '.join(tokens[i:i + 2]) for i in range(len(tokens) - 1)]
+    
+    def count(self, texts):
+        """Raw term counts over the saved vocabulary (unknown terms are dropped)"""
+        indptr, indices, data = [0], [], []
+        for text in texts:
+            columns = Counter(column for column in self.columns(self.analyze(text)) if column is not None)
+            for column in sorted(columns):
+                indices.append(column)
+                data.append(columns[column])
+            indptr.append(len(indices))
+        return sp.csr_matrix(
+            (np.array(data, dtype=np.int64), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+            shape=(len(texts), self.n_terms)
+        )
+    
+    def transform(self, texts):
+        return tfidf_weight(self.count(texts), self.idf_)
+    
+    def term(self, column):
+        return self._term_bytes(column).decode('utf-8')
+    
+    def get_feature_names_out(self):
+        return np.array([self.term(column) for column in range(self.n_terms)], dtype=object)
+
+def count_terms(vectorizer, texts):
+    """Raw term counts from a fitted per-field vectorizer of any engine"""
+    if isinstance(vectorizer, (HashingTfidfVectorizer, CompactTfidfVectorizer)):
+        return vectorizer.count(texts)
+    return CountVectorizer.transform(vectorizer, texts)
+
+class TermCounter:
+    """Document and corpus frequencies of one field's terms, counted chunk by chunk
+    
+    Feeding every text through partial_fit() and then calling vectorizer() gives
+    the same vocabulary and IDF as make_tfidf_vectorizer().fit() on all texts at
+    once. Once more than max_terms distinct terms are counted, terms below a
+    rising corpus frequency are dropped; those are far below the max_features
+    cut-off, so only a vocabulary tied at the cut-off could change.
+    """
+    
+    def __init__(self, max_terms=STREAM_MAX_TERMS):
+        self.max_terms = max_terms
+        self.doc_freq = Counter()
+        self.term_freq = Counter()
+        self.n_docs = 0
+        self.min_term_freq = 1
+    
+    def partial_fit(self, texts):
+        """Add documents to the counts"""
+        self.n_docs += len(texts)
+        counter = make_tfidf_vectorizer().set_params(max_df=1.0, max_features=None)
+        try:
+            counts = CountVectorizer.fit_transform(counter, texts)
+        except ValueError:
+            # No terms in this chunk
+            return self
+        
+        terms = counter.get_feature_names_out().tolist()
+        doc_freq = np.bincount(counts.indices, minlength=len(terms)).tolist()
+        term_freq = np.asarray(counts.sum(axis=0)).ravel().tolist()
+        for term, df, tf in zip(terms, doc_freq, term_freq):
+            if tf >= self.min_term_freq or term in self.term_freq:
+                self.doc_freq[term] += df
+                self.term_freq[term] += tf
+        
+        while len(self.term_freq) > self.max_terms:
+            self.prune()
+        return self
+    
+    def prune(self):
+        """Drop the terms seen fewer than min_term_freq + 1 times so far; returns how many"""
+        self.min_term_freq += 1
+        dropped = [term for term, tf in self.term_freq.items() if tf < self.min_term_freq]
+        for term in dropped:
+            del self.term_freq[term]
+            del self.doc_freq[term]
+        return len(dropped)
+    
+    def vectorizer(self):
+        """Fitted make_tfidf_vectorizer() for the counted texts, None if no term survives max_df"""
+        vectorizer = make_tfidf_vectorizer()
+        terms = sorted(self.doc_freq)
+        doc_freq = np.array([self.doc_freq[term] for term in terms], dtype=np.int64)
+        term_freq = np.array([self.term_freq[term] for term in terms], dtype=np.int64)
+        
+        # The same selection CountVectorizer._limit_features() makes
+        mask = (doc_freq <= vectorizer.max_df * self.n_docs) & (doc_freq >= vectorizer.min_df)
+        if vectorizer.max_features is not None and mask.sum() > vectorizer.max_features:
+            keep = (-term_freq[mask]).argsort()[:vectorizer.max_features]
+            limited = np.zeros(len(mask), dtype=bool)
+            limited[np.where(mask)[0][keep]] = True
+            mask = limited
+        
+        kept = np.where(mask)[0]
+        if not len(kept):
+            return None
+        vectorizer.vocabulary_ = {terms[column]: i for i, column in enumerate(kept)}
+        vectorizer.idf_ = smoothed_idf(doc_freq[kept], self.n_docs)
+        return vectorizer
+
+class FieldWeightedVectorizer:
+    """One TF-IDF vectorizer per job field, with the field blocks weighted and stacked
+    
+    Each field block is L2-normalized, multiplied by the field's weight and the
+    stacked row is normalized again, so dot products between rows are cosines.
+    """
+    
+    def __init__(self, weights=None, vectorizer_factory=make_tfidf_vectorizer):
+        self.weights = dict(weights or FIELD_WEIGHTS)
+        self.vectorizer_factory = vectorizer_factory
+        self.vectorizers = {}
+        self.offsets = {}
+        self.n_features = 0
+        
+        # {field: (vectorizer, term array)} of fitted sklearn vectorizers, for term_names
+        self._feature_names = {}
+    
+    @property
+    def fields(self):
+        return list(self.weights)
+    
+    def fit_transform(self, field_texts):
+        """Fit one vectorizer per field on {field: texts} and return the stacked rows"""
+        n_docs = len(field_texts[self.fields[0]])
+        blocks = []
+        self.vectorizers = {}
+        
+        for field in self.fields:
+            vectorizer = self.vectorizer_factory()
+            try:
+                blocks.append(vectorizer.fit_transform(field_texts[field]))
+            except ValueError:
+                # No usable terms in this field (all empty, or all pruned by max_df)
+                vectorizer = None
+                blocks.append(sp.csr_matrix((n_docs, 0)))
+            self.vectorizers[field] = vectorizer
+        
+        offset = 0
+        for field, block in zip(self.fields, blocks):
+            self.offsets[field] = offset
+            offset += block.shape[1]
+        self.n_features = offset
+        
+        return self._stack(blocks)
+    
+    def _field_blocks(self, field_texts, transform):
+        n_docs = len(field_texts[self.fields[0]])
+        return [
+            transform(self.vectorizers[field], field_texts[field])
+            if self.vectorizers[field] is not None else sp.csr_matrix((n_docs, 0))
+            for field in self.fields
+        ]
+    
+    def transform(self, field_texts):
+        """Weighted TF-IDF rows for {field: texts} using the fitted vocabularies"""
+        return self._stack(self._field_blocks(field_texts, lambda vectorizer, texts: vectorizer.transform(texts)))
+    
+    def transform_query(self, texts):
+        """Vectorize free text (e.g. graduate profiles) against every field's vocabulary"""
+        return self.transform({field: texts for field in self.fields})
+    
+    def count(self, field_texts):
+        """Raw term counts for {field: texts}, laid out like the stacked rows"""
+        blocks = self._field_blocks(field_texts, count_terms)
+        return sp.hstack(blocks, format='csr')
+    
+    def weight_counts(self, counts):
+        """Turn stacked raw counts into weighted rows using the current IDF"""
+        blocks = []
+        for field in self.fields:
+            start = self.offsets[field]
+            block = counts[:, start:start + self._width(field)]
+            if block.shape[1]:
+                block = tfidf_weight(block, self.vectorizers[field].idf_)
+            blocks.append(block.astype(np.float64))
+        return self._stack(blocks)
+    
+    def widths(self):
+        """{field: number of columns}, None for fields without a vectorizer"""
+        return {
+            field: None if self.vectorizers[field] is None else self._width(field)
+            for field in self.fields
+        }
+    
+    def restore(self, widths, make_vectorizer):
+        """Rebuild the field layout from saved widths; make_vectorizer(field, start, width)"""
+        self.vectorizers = {}
+        offset = 0
+        for field in self.fields:
+            width = widths[field]
+            self.offsets[field] = offset
+            self.vectorizers[field] = None if width is None else make_vectorizer(field, offset, width)
+            offset += width or 0
+        self.n_features = offset
+        return self
+    
+    def vocabulary_blob(self):
+        """Every column's term as one UTF-8 blob, plus n_features + 1 offsets into it"""
+        terms = [
+            term.encode('utf-8')
+            for field in self.fields if self.vectorizers[field] is not None
+            for term in self.vectorizers[field].get_feature_names_out()
+        ]
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(term) for term in terms])
+        return np.frombuffer(b''.join(terms), dtype=np.uint8), offsets
+    
+    def _width(self, field):
+        vectorizer = self.vectorizers[field]
+        return 0 if vectorizer is None else len(vectorizer.idf_)
+    
+    def _stack(self, blocks):
+        weighted = [block * self.weights[field] for field, block in zip(self.fields, blocks)]
+        return normalize(sp.hstack(weighted, format='csr'))
+    
+    @property
+    def idf_(self):
+        """IDF of every stacked column"""
+        return np.concatenate([np.zeros(0)] + [
+            self.vectorizers[field].idf_ for field in self.fields if self.vectorizers[field] is not None
+        ])
+    
+    def set_doc_freq(self, doc_freq, n_docs):
+        """Recompute every field's IDF from stacked document frequencies"""
+        for field in self.fields:
+            vectorizer = self.vectorizers[field]
+            if vectorizer is None:
+                continue
+            start = self.offsets[field]
+            field_freq = doc_freq[start:start + self._width(field)]
+            if isinstance(vectorizer, HashingTfidfVectorizer):
+                vectorizer.doc_freq_ = field_freq
+                vectorizer.n_docs_ = n_docs
+            else:
+                vectorizer.idf_ = smoothed_idf(field_freq, n_docs)
+    
+    def copy(self):
+        """Copy whose IDF (set_doc_freq) can change without touching this vectorizer
+        
+        Vocabularies and term arrays are shared; only the per-field IDF holders are new.
+        """
+        clone = copy.copy(self)
+        clone.vectorizers = {}
+        clone._feature_names = {}
+        for field, vectorizer in self.vectorizers.items():
+            if vectorizer is not None:
+                vectorizer = copy.copy(vectorizer)
+                if hasattr(vectorizer, '_tfidf'):
+                    # A fitted TfidfVectorizer keeps idf_ on its TfidfTransformer
+                    vectorizer._tfidf = copy.copy(vectorizer._tfidf)
+                if field in self._feature_names:
+                    clone._feature_names[field] = (vectorizer, self._feature_names[field][1])
+            clone.vectorizers[field] = vectorizer
+        return clone
+    
+    def term_names(self, columns):
+        """Term of each given stacked column (without its field), None for hashed columns
+        
+        Only the given columns are looked up, a field at a time: restored
+        vectorizers decode them from the vocabulary blob, fitted ones index a
+        term array built once.
+        """
+        columns = np.asarray(columns, dtype=np.int64)
+        names = np.full(len(columns), None, dtype=object)
+        starts = sorted((self.offsets[field], field) for field in self.fields if self.vectorizers[field] is not None)
+        positions = np.searchsorted([start for start, _ in starts], columns, side='right') - 1
+        for position, (start, field) in enumerate(starts):
+            in_field = positions == position
+            vectorizer = self.vectorizers[field]
+            if not in_field.any() or isinstance(vectorizer, HashingTfidfVectorizer):
+                continue
+            local = columns[in_field] - start
+            if isinstance(vectorizer, CompactTfidfVectorizer):
+                names[in_field] = [vectorizer.term(column) for column in local.tolist()]
+            else:
+                cached = self._feature_names.get(field)
+                if cached is None or cached[0] is not vectorizer:
+                    cached = self._feature_names[field] = (vectorizer, vectorizer.get_feature_names_out())
+                names[in_field] = cached[1][local]
+        return names.tolist()
+    
+    def get_feature_names_out(self):
+        """Column names as 'field:term'"""
+        return np.concatenate([np.zeros(0, dtype=object)] + [
+            np.array([f"{field}:{term}" for term in self.vectorizers[field].get_feature_names_out()], dtype=object)
+            for field in self.fields if self.vectorizers[field] is not None
+        ])
+
+class InvertedIndex:
+    """Term -> job posting lists over the TF-IDF matrix, for exact top-k retrieval
+    
+    Posting lists are sorted by weight, so each term's first entry bounds how much
+    it can add to any job's score. Queries use max-score pruning: terms are visited
+    from the largest bound down, and once the bounds of the remaining terms cannot
+    lift an unseen job past the current k-th best partial score, only the jobs
+    already seen are rescored exactly.
+    """
+    
+    def __init__(self, matrix):
+        self.matrix = matrix.tocsr()
+        csc = self.matrix.tocsc()
+        csc.sort_indices()
+        
+        # Order every posting list by descending weight
+        terms = np.repeat(np.arange(csc.shape[1]), np.diff(csc.indptr))
+        order = np.lexsort((-csc.data, terms))
+        self.indptr = csc.indptr
+        self.postings = csc.indices[order]
+        self.weights = csc.data[order]
+        
+        self.max_weight = np.zeros(csc.shape[1], dtype=self.weights.dtype)
+        non_empty = np.diff(self.indptr) > 0
+        self.max_weight[non_empty] = self.weights[self.indptr[:-1][non_empty]]
+    
+    def top_k(self, query, k):
+        """Exact (rows, scores) of the k best-scoring jobs for a 1 x n_features query"""
+        query = query.tocsr()
+        terms, query_weights = query.indices, query.data
+        bounds = query_weights * self.max_weight[terms]
+        
+        order = np.argsort(-bounds, kind='stable')
+        order = order[bounds[order] > 0]
+        terms, query_weights, bounds = terms[order], query_weights[order], bounds[order]
+        if len(terms) == 0 or k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        
+        # remaining[i]: the most terms i.. can still add to any job's score
+        remaining = np.append(np.cumsum(bounds[::-1])[::-1], 0.0)
+        
+        partial = np.zeros(self.matrix.shape[0])
+        seen = np.zeros(self.matrix.shape[0], dtype=bool)
+        candidates = []
+        threshold = -np.inf
+        best_partial = 0.0
+        n_candidates = 0
+        
+        for i, (term, weight) in enumerate(zip(terms, query_weights)):
+            if remaining[i] < threshold:
+                break
+            start, end = self.indptr[term], self.indptr[term + 1]
+            rows = self.postings[start:end]
+            partial[rows] += weight * self.weights[start:end]
+            best_partial = max(best_partial, partial[rows].max())
+            
+            new_rows = rows[~seen[rows]]
+            seen[new_rows] = True
+            candidates.append(new_rows)
+            n_candidates += len(new_rows)
+            
+            # The k-th best partial score can only stop the scan once the remaining
+            # bound drops below the best partial score, so skip the selection until then
+            if n_candidates >= k and remaining[i + 1] < best_partial:
+                seen_rows = np.concatenate(candidates)
+                candidates = [seen_rows]
+                threshold = np.partition(partial[seen_rows], n_candidates - k)[n_candidates - k]
+        else:
+            i = len(terms)
+        
+        # Unseen jobs score at most remaining[i] < threshold; finish scoring only the
+        # seen jobs that could still reach the top k once the skipped terms are added
+        rows = np.concatenate(candidates)
+        rows = rows[partial[rows] + remaining[i] >= threshold]
+        
+        skipped = slice(i, len(terms))
+        posting_volume = np.sum(self.indptr[terms[skipped] + 1] - self.indptr[terms[skipped]])
+        row_volume = np.sum(self.matrix.indptr[rows + 1] - self.matrix.indptr[rows])
+        
+        if row_volume < posting_volume:
+            # Few candidates: rescore their rows exactly
+            scores = self.matrix[rows] @ query.toarray().ravel()
+        else:
+            # Many candidates: add the skipped terms' postings for candidates only
+            is_candidate = np.zeros(self.matrix.shape[0], dtype=bool)
+            is_candidate[rows] = True
+            for term, weight in zip(terms[skipped], query_weights[skipped]):
+                start, end = self.indptr[term], self.indptr[term + 1]
+                postings = self.postings[start:end]
+                keep = is_candidate[postings]
+                partial[postings[keep]] += weight * self.weights[start:end][keep]
+            scores = partial[rows]
+        
+        top = top_k_indices(scores, k)
+        return rows[top], scores[top]
+
+class LatentSemanticIndex:
+    """Dense LSA embeddings of the job rows, from a randomized truncated SVD of the TF-IDF matrix
+    
+    Rows are projected onto the top singular directions of the corpus and
+    L2-normalized, so terms that co-occur across postings ("developer",
+    "software engineer") land close together. Embeddings are one contiguous
+    float32 row-major matrix: scoring a profile is a single BLAS matrix-vector
+    product, whatever the profile's terms.
+    
+    projection holds the singular directions column-wise (n_features x
+    n_components, row-major), so projecting a sparse row only reads the rows
+    of its terms.
+    """
+    
+    def __init__(self, projection, embeddings):
+        self.projection = projection
+        self.embeddings = embeddings
+    
+    @classmethod
+    def fit(cls, matrix, n_components, seed=0):
+        """Index for a job matrix; None when the matrix is too small to reduce"""
+        n_components = min(n_components, min(matrix.shape) - 1)
+        if n_components < 1:
+            return None
+        svd = TruncatedSVD(n_components=n_components, algorithm='randomized', random_state=seed)
+        svd.fit(matrix)
+        index = cls(np.ascontiguousarray(svd.components_.T, dtype=np.float32), None)
+        index.embeddings = index.project(matrix)
+        return index
+    
+    @property
+    def n_components(self):
+        return self.projection.shape[1]
+    
+    def project(self, matrix):
+        """L2-normalized float32 embeddings of TF-IDF rows (rows without terms stay zero)"""
+        # Cast the sparse side: a float64 row would upcast (copy) the whole projection
+        embeddings = np.asarray(matrix.astype(np.float32) @ self.projection)
+        return np.ascontiguousarray(normalize(embeddings))
+    
+    def scores(self, vector):
+        """Cosine similarity of every job to one TF-IDF row"""
+        return self.embeddings @ self.project(vector).ravel()
+    
+    def append(self, matrix):
+        return LatentSemanticIndex(self.projection, np.vstack([self.embeddings, self.project(matrix)]))
+    
+    def replace(self, row, matrix):
+        embeddings = np.array(self.embeddings)
+        embeddings[row] = self.project(matrix)[0]
+        return LatentSemanticIndex(self.projection, embeddings)
+    
+    def take(self, rows):
+        return LatentSemanticIndex(self.projection, np.ascontiguousarray(self.embeddings[rows]))
+
+class GraduateIndex:
+    """Profile vectors of the registered graduates, one CSR row each, for ranking candidates
+    
+    Rows are L2-normalized like the job rows, so one sparse product with a job's
+    row scores every graduate. The index belongs to the vectorizer it was built
+    with; edited profiles are swapped in with upsert().
+    """
+    
+    def __init__(self, vectorizer, matrix, graduate_ids):
+        self.vectorizer = vectorizer
+        self.matrix = matrix
+        self.graduate_ids = list(graduate_ids)
+        self._rows = {graduate_id: row for row, graduate_id in enumerate(self.graduate_ids)}
+    
+    def __len__(self):
+        return len(self.graduate_ids)
+    
+    def upsert(self, graduate_id, vector):
+        """Set a graduate's row (None for an empty profile, which never matches)"""
+        if vector is None:
+            vector = sp.csr_matrix((1, self.matrix.shape[1]), dtype=self.matrix.dtype)
+        vector = vector.astype(self.matrix.dtype)
+        
+        row = self._rows.get(graduate_id)
+        if row is None:
+            self._rows[graduate_id] = len(self.graduate_ids)
+            self.graduate_ids.append(graduate_id)
+            self.matrix = sp.vstack([self.matrix, vector], format='csr')
+        else:
+            self.matrix = sp.vstack([self.matrix[:row], vector, self.matrix[row + 1:]], format='csr')
+    
+    def top_k(self, job_vector, k, graduate_ids=None):
+        """[(graduate_id, cosine)] of the k best-matching graduates (optionally among graduate_ids)"""
+        if graduate_ids is None:
+            candidates, matrix = self.graduate_ids, self.matrix
+        else:
+            candidates = [graduate_id for graduate_id in graduate_ids if graduate_id in self._rows]
+            matrix = self.matrix[[self._rows[graduate_id] for graduate_id in candidates]]
+        if not candidates:
+            return []
+        
+        scores = matrix @ job_vector.toarray().ravel().astype(matrix.dtype)
+        top = top_k_indices(scores, k)
+        return [(candidates[row], float(scores[row])) for row in top if scores[row] > 0]
+
+class CoApplicationIndex:
+    """Item-item co-application counts: how many graduates applied to both of two jobs
+    
+    matrix is A.T @ A for the binary graduate x job application matrix A, with
+    rows and columns indexed by job id (so the index does not depend on the
+    recommender's rows and survives refits) and the diagonal moved to counts,
+    the number of applicants of each job. New applications are buffered per
+    job in pending and folded into matrix with one sparse addition once
+    merge_pending pairs have accumulated.
+    """
+    
+    def __init__(self, matrix, counts, merge_pending=10000):
+        self.matrix = matrix
+        self.counts = counts
+        self.merge_pending = merge_pending
+        self.pending = {}
+        self.n_pending = 0
+    
+    @classmethod
+    def build(cls, graduate_ids, job_ids, **kwargs):
+        """Index of the (graduate_id, job_id) application pairs; repeated pairs count once"""
+        graduate_ids = np.asarray(graduate_ids, dtype=np.int64)
+        job_ids = np.asarray(job_ids, dtype=np.int64)
+        n_ids = int(job_ids.max()) + 1 if len(job_ids) else 0
+        
+        _, graduate_rows = np.unique(graduate_ids, return_inverse=True)
+        applications = sp.csr_matrix(
+            (np.ones(len(job_ids), dtype=np.float32), (graduate_rows, job_ids)),
+            shape=(int(graduate_rows.max()) + 1 if len(job_ids) else 0, n_ids)
+        )
+        applications.sum_duplicates()
+        applications.data[:] = 1
+        
+        matrix = (applications.T @ applications).tocsr()
+        counts = matrix.diagonal()
+        matrix.setdiag(0)
+        matrix.eliminate_zeros()
+        return cls(matrix, counts, **kwargs)
+    
+    @property
+    def n_ids(self):
+        return len(self.counts)
+    
+    def _grow(self, n_ids):
+        if n_ids > self.n_ids:
+            self.counts = np.concatenate([self.counts, np.zeros(n_ids - self.n_ids, dtype=self.counts.dtype)])
+    
+    def add(self, job_id, other_job_ids):
+        """Record a new application to job_id by a graduate who applied to other_job_ids before"""
+        others = [other for other in set(other_job_ids) if other != job_id]
+        self._grow(max([job_id] + others) + 1)
+        self.counts[job_id] += 1
+        for other in others:
+            for row, column in ((job_id, other), (other, job_id)):
+                row_pending = self.pending.setdefault(row, {})
+                row_pending[column] = row_pending.get(column, 0) + 1
+        self.n_pending += 2 * len(others)
+        if self.n_pending >= self.merge_pending:
+            self.merge()
+    
+    def merge(self):
+        """Fold the pending pairs into matrix"""
+        if not self.pending:
+            return
+        rows, columns, values = [], [], []
+        for row, row_pending in self.pending.items():
+            rows.extend([row] * len(row_pending))
+            columns.extend(row_pending)
+            values.extend(row_pending.values())
+        
+        matrix = self.matrix.copy()
+        matrix.resize((self.n_ids, self.n_ids))
+        delta = sp.csr_matrix((np.asarray(values, dtype=matrix.dtype), (rows, columns)), shape=matrix.shape)
+        self.matrix = (matrix + delta).tocsr()
+        self.pending, self.n_pending = {}, 0
+    
+    def scores(self, applied_lists, job_ids):
+        """(len(applied_lists) x len(job_ids)) co-application scores in [0, 1]
+        
+        A graduate's score for a job is the mean, over the jobs they applied to,
+        of the cosine between the two jobs' applicant sets
+        (co-applicants / sqrt(applicants of one * applicants of the other)).
+        Graduates without applications score 0 everywhere.
+        """
+        job_ids = np.asarray(job_ids, dtype=np.int64)
+        rows, columns, weights = [], [], []
+        for row, applied in enumerate(applied_lists):
+            applied = [job_id for job_id in set(applied) if 0 <= job_id < self.n_ids and self.counts[job_id] > 0]
+            for job_id in applied:
+                rows.append(row)
+                columns.append(job_id)
+                weights.append(1.0 / (len(applied) * np.sqrt(self.counts[job_id])))
+        
+        shape = (len(applied_lists), self.n_ids)
+        profile = sp.csr_matrix((np.asarray(weights, dtype=np.float32), (rows, columns)), shape=shape)
+        matrix = self.matrix
+        if matrix.shape != (self.n_ids, self.n_ids):
+            matrix = matrix.copy()
+            matrix.resize((self.n_ids, self.n_ids))
+        scores = profile @ matrix
+        
+        # Pending pairs of the applied jobs only, without merging the whole matrix
+        pending = [
+            (row, column, weight * count)
+            for row, job_id, weight in zip(rows, columns, weights)
+            for column, count in self.pending.get(job_id, {}).items()
+        ]
+        if pending:
+            pending_rows, pending_columns, pending_values = zip(*pending)
+            scores = scores + sp.csr_matrix(
+                (np.asarray(pending_values, dtype=np.float32), (pending_rows, pending_columns)), shape=shape
+            )
+        
+        known = (job_ids >= 0) & (job_ids < self.n_ids)
+        columns = job_ids[known]
+        counts = self.counts[columns]
+        with np.errstate(divide='ignore'):
+            column_norms = np.where(counts > 0, 1.0 / np.sqrt(counts), 0.0).astype(np.float32)
+        
+        result = np.zeros((len(applied_lists), len(job_ids)), dtype=np.float32)
+        result[:, known] = scores.toarray()[:, columns] * column_norms
+        return result
+
+class JobRecord:
+    """Metadata of one indexed job posting"""
+    __slots__ = ('id', 'category', 'location', 'job_type', 'salary_min', 'salary_max')
+    
+    def __init__(self, id, category, location, job_type, salary_min, salary_max):
+        self.id = id
+        self.category = category
+        self.location = location
+        self.job_type = job_type
+        self.salary_min = salary_min
+        self.salary_max = salary_max
+    
+    def __repr__(self):
+        return f"JobRecord({self.id}, {self.category!r}, {self.location!r})"
+
+class JobStore:
+    """Column-oriented metadata of the indexed jobs, one entry per tfidf_matrix row
+    
+    Holds job ids, integer codes for the categorical fields (into per-field
+    label lists, -1 for missing) and salary bounds (NaN when unknown) as NumPy
+    arrays. Raw and processed text is not kept once a job has been vectorized.
+    location_key codes the normalized location (see location_key()), which is
+    what location filters match on.
+    """
+    __slots__ = ('ids', 'codes', 'labels', 'salary_min', 'salary_max')
+    
+    CODED_FIELDS = ('category', 'location', 'job_type', 'location_key')
+    
+    # Coded fields computed from another column: {field: (source column, function)}
+    DERIVED_FIELDS = {'location_key': ('location', location_key)}
+    
+    def __init__(self, ids, codes, labels, salary_min, salary_max):
+        self.ids = ids
+        self.codes = codes
+        self.labels = labels
+        self.salary_min = salary_min
+        self.salary_max = salary_max
+    
+    @classmethod
+    def from_frame(cls, job_df, labels=None):
+        """Store for a prepared job frame; codes extend the given labels ({field: [label]})"""
+        labels = {field: list(labels[field]) if labels else [] for field in cls.CODED_FIELDS}
+        codes = {}
+        for field in cls.CODED_FIELDS:
+            index = {label: code for code, label in enumerate(labels[field])}
+            source, derive = cls.DERIVED_FIELDS.get(field, (field, None))
+            values = job_df[source].tolist() if source in job_df.columns else [''] * len(job_df)
+            if derive is not None:
+                values = [derive(value) for value in values]
+            field_codes = np.full(len(values), -1, dtype=np.int32)
+            for row, value in enumerate(values):
+                if value:
+                    code = index.get(value)
+                    if code is None:
+                        code = index[value] = len(labels[field])
+                        labels[field].append(value)
+                    field_codes[row] = code
+            codes[field] = field_codes
+        
+        def salary(column):
+            if column not in job_df.columns:
+                return np.full(len(job_df), np.nan)
+            return pd.to_numeric(job_df[column], errors='coerce').to_numpy(dtype=np.float64)
+        
+        return cls(
+            job_df['id'].to_numpy(dtype=np.int64),
+            codes,
+            labels,
+            salary('salary_min'),
+            salary('salary_max')
+        )
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def take(self, rows):
+        """Store of the selected rows (index array or boolean mask)"""
+        return JobStore(
+            self.ids[rows],
+            {field: codes[rows] for field, codes in self.codes.items()},
+            self.labels,
+            self.salary_min[rows],
+            self.salary_max[rows]
+        )
+    
+    def concat(self, other):
+        """Rows of self followed by rows of other, whose labels extend self's"""
+        return JobStore.concat_all([self, other])
+    
+    @classmethod
+    def concat_all(cls, stores):
+        """Rows of every store in order, with one copy per array; each store's labels extend the previous ones'"""
+        return cls(
+            np.concatenate([store.ids for store in stores]),
+            {field: np.concatenate([store.codes[field] for store in stores]) for field in cls.CODED_FIELDS},
+            stores[-1].labels,
+            np.concatenate([store.salary_min for store in stores]),
+            np.concatenate([store.salary_max for store in stores])
+        )
+    
+    def replace(self, row, other):
+        """Copy of the store with row replaced by other's single row"""
+        store = self.take(np.arange(len(self)))
+        store.labels = other.labels
+        store.ids[row] = other.ids[0]
+        for field in self.CODED_FIELDS:
+            store.codes[field][row] = other.codes[field][0]
+        store.salary_min[row] = other.salary_min[0]
+        store.salary_max[row] = other.salary_max[0]
+        return store
+    
+    def codes_for(self, field, labels):
+        """Codes of the given labels in a coded field (labels never seen are dropped)"""
+        index = {label: code for code, label in enumerate(self.labels[field])}
+        return np.array([index[label] for label in labels if label in index], dtype=np.int32)
+    
+    def label(self, field, row):
+        code = self.codes[field][row]
+        return self.labels[field][code] if code >= 0 else None
+    
+    def record(self, row):
+        """JobRecord for one row"""
+        def bound(values):
+            return None if np.isnan(values[row]) else float(values[row])
+        return JobRecord(
+            int(self.ids[row]),
+            self.label('category', row),
+            self.label('location', row),
+            self.label('job_type', row),
+            bound(self.salary_min),
+            bound(self.salary_max)
+        )
+    
+    @property
+    def nbytes(self):
+        """Bytes held by the arrays (labels are shared and small)"""
+        arrays = [self.ids, self.salary_min, self.salary_max] + list(self.codes.values())
+        return sum(array.nbytes for array in arrays)
+    
+    def arrays(self):
+        """{name: array} for saving alongside a model"""
+        arrays = {'job_ids': self.ids, 'salary_min': self.salary_min, 'salary_max': self.salary_max}
+        arrays.update({f"{field}_codes": codes for field, codes in self.codes.items()})
+        return arrays
+    
+    @classmethod
+    def from_arrays(cls, array, labels):
+        """Store from array(name) lookups of what arrays() saved"""
+        return cls(
+            array('job_ids'),
+            {field: array(f"{field}_codes") for field in cls.CODED_FIELDS},
+            {field: list(labels[field]) for field in cls.CODED_FIELDS},
+            array('salary_min'),
+            array('salary_max')
+        )
+
+class JobFilter:
+    """Hard constraints on the jobs a query may return
+    
+    Each given constraint must hold; None leaves it open. categories and
+    job_types match the stored labels exactly, locations match by
+    location_key(). min_salary keeps jobs whose pay can reach it and
+    max_salary jobs whose pay can start at or below it; jobs with no parsed
+    salary pass unless include_unknown_salary is False.
+    
+    mask() evaluates the spec over a JobStore's columns with vectorized NumPy
+    comparisons, so queries only score the eligible rows.
+    """
+    
+    def __init__(self, categories=None, locations=None, job_types=None,
+                 min_salary=None, max_salary=None, include_unknown_salary=True):
+        self.categories = categories
+        self.locations = locations
+        self.job_types = job_types
+        self.min_salary = min_salary
+        self.max_salary = max_salary
+        self.include_unknown_salary = include_unknown_salary
+    
+    @classmethod
+    def for_graduate(cls, graduate, location=True, salary=False, **kwargs):
+        """Filter on a graduate's location and/or salary preference (plus any explicit constraints)
+        
+        The salary constraint keeps jobs that can pay the preference's lower figure.
+        """
+        if location and location_key(graduate.location_preference):
+            kwargs.setdefault('locations', [graduate.location_preference])
+        if salary:
+            expected, _ = parse_salary(graduate.salary_preference)
+            if expected is not None:
+                kwargs.setdefault('min_salary', expected)
+        return cls(**kwargs)
+    
+    @property
+    def is_open(self):
+        """True when the spec constrains nothing"""
+        return (self.categories is None and self.locations is None and self.job_types is None
+                and self.min_salary is None and self.max_salary is None)
+    
+    def key(self):
+        """Hashable form of the spec, equal for specs admitting the same jobs"""
+        def labels(values, normalize=str):
+            return None if values is None else tuple(sorted({normalize(value) for value in values}))
+        return (labels(self.categories), labels(self.locations, location_key), labels(self.job_types),
+                self.min_salary, self.max_salary, self.include_unknown_salary)
+    
+    def mask(self, jobs):
+        """Boolean array over the store's rows, True where a job is eligible"""
+        mask = np.ones(len(jobs), dtype=bool)
+        coded = [
+            ('category', self.categories),
+            ('location_key', None if self.locations is None else [location_key(l) for l in self.locations]),
+            ('job_type', self.job_types),
+        ]
+        for field, labels in coded:
+            if labels is not None:
+                mask &= np.isin(jobs.codes[field], jobs.codes_for(field, labels))
+        
+        if self.min_salary is not None or self.max_salary is not None:
+            # A missing bound falls back to the other one (single-figure salaries)
+            low = np.where(np.isnan(jobs.salary_min), jobs.salary_max, jobs.salary_min)
+            high = np.where(np.isnan(jobs.salary_max), jobs.salary_min, jobs.salary_max)
+            unknown = np.isnan(low)
+            salary_ok = np.ones(len(jobs), dtype=bool)
+            with np.errstate(invalid='ignore'):
+                if self.min_salary is not None:
+                    salary_ok &= high >= self.min_salary
+                if self.max_salary is not None:
+                    salary_ok &= low <= self.max_salary
+            mask &= np.where(unknown, self.include_unknown_salary, salary_ok)
+        return mask
 
 class JobRecommender:
-    def __init__(self):
+    def __init__(self, refit_threshold=0.2, text_cache=None, field_weights=None,
+                 inverted_index_min_jobs=INVERTED_INDEX_MIN_JOBS, engine='tfidf',
+                 hashing_features=HASHING_FEATURES, profile_cache=None, lsa_components=None,
+                 index_dtype='float32', max_terms_per_job=None, content_weight=1.0,
+                 co_application_weight=0.0):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown recommender engine {engine!r}, expected one of {ENGINES}")
+        
+        self.field_weights = dict(field_weights or FIELD_WEIGHTS)
+        self.engine = engine
+        self.hashing_features = hashing_features
         self.vectorizer = None
         self.tfidf_matrix = None
-        self.job_dataframe = None
+        
+        # Index compaction (see compact_rows): storage type of tfidf_matrix, the
+        # per-row scales of a uint8 index, and the optional per-row term budget.
+        # With a term budget, removing a posting cannot subtract the document
+        # frequencies of its pruned terms; the drift-based refit resets them.
+        if index_dtype not in INDEX_DTYPES:
+            raise ValueError(f"Unknown index dtype {index_dtype!r}, expected one of {INDEX_DTYPES}")
+        self.index_dtype = index_dtype
+        self.max_terms_per_job = max_terms_per_job
+        self.row_scales = None
+        
+        # Metadata of every tfidf_matrix row (JobStore), kept in step with the
+        # matrix; assigning it also sets job_ids and rebuilds the id -> row index
+        self.jobs = None
+        
+        # Inverted index for pruned retrieval on large corpora, built on first use
+        # (None disables it) and dropped whenever the matrix changes
+        self.inverted_index_min_jobs = inverted_index_min_jobs
+        self.inverted_index = None
+        
+        # Optional LSA mode: jobs are scored by dense embeddings of lsa_components
+        # dimensions (LatentSemanticIndex) instead of their sparse TF-IDF rows
+        self.lsa_components = lsa_components
+        self.lsa = None
+        
+        # Weights of the content (cosine) score and the co-application score
+        # (CoApplicationIndex.scores) in the blended score of graduates who applied
+        self.content_weight = content_weight
+        self.co_application_weight = co_application_weight
+        
+        # Optional store of preprocessed field text keyed by job id and content hash,
+        # with get_many(job_ids) -> {job_id: (hash, texts)} and put_many(entries)
+        self.text_cache = text_cache
+        
+        # Optional cache of profile vectors with get(key, fingerprint, model_version)
+        # and put(key, fingerprint, model_version, vector); model_version changes
+        # whenever the vectorizer state does
+        self.profile_cache = profile_cache
+        self.model_version = next(_model_versions)
+        
+        # Incremental index state: document frequencies behind the IDF weights and
+        # the number of postings changed since the last full fit
+        self.refit_threshold = refit_threshold
+        self.doc_freq = None
+        self.n_docs = 0
+        self.fitted_docs = 0
+        self.changes_since_fit = 0
     
     def preprocess_text(self, text):
         """Preprocess text by cleaning, tokenizing, removing stopwords, and lemmatizing"""
-        if not isinstance(text, str) or pd.isna(text):
-            return ''
-        
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove URLs, email addresses, special characters, and numbers
-        text = re.sub(r'http\S+|www\S+|https\S+', ' ', text)
-        text = re.sub(r'\S+@\S+', ' ', text)
-        text = re.sub(r'[^\w\s]', ' ', text)
-        text = re.sub(r'\d+', ' ', text)
-        
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        # Tokenize
-        tokens = word_tokenize(text)
-        
-        # Remove stopwords
-        stop_words = set(stopwords.words('english'))
-        # Add custom domain-specific stopwords
-        custom_stopwords = {'job', 'work', 'company', 'position', 'required', 'requirements',
-                           'experience', 'skill', 'skills', 'candidate', 'opportunity', 'role'}
-        stop_words.update(custom_stopwords)
-        tokens = [word for word in tokens if word not in stop_words]
-        
-        # Lemmatize
-        lemmatizer = WordNetLemmatizer()
-        tokens = [lemmatizer.lemmatize(word) for word in tokens]
-        
-        # Remove short words (length < 3)
-        tokens = [word for word in tokens if len(word) >= 3]
-        
-        # Join tokens back into text
-        return ' '.join(tokens)
-    
-    def create_combined_features(self, job_df):
-        """Create weighted combination of job features for better matching"""
-        job_df = job_df.copy()
-        
-        # Process all text columns
-        job_df['title_processed'] = job_df['title'].apply(self.preprocess_text)
-        job_df['description_processed'] = job_df['description'].apply(self.preprocess_text)
-        job_df['category_processed'] = job_df['category'].apply(self.preprocess_text)
-        job_df['role_processed'] = job_df['role'].apply(self.preprocess_text)
-        job_df['qualification_processed'] = job_df['qualification'].apply(self.preprocess_text)
-        
-        # Create weighted combination
-        weights = {
-            'title_processed': 3.0,             # Job title is very important
-            'description_processed': 2.0,       # Job description contains detailed requirements
-            'category_processed': 1.5,          # Category provides general field
-            'role_processed': 2.0,              # Role indicates position level
-            'qualification_processed': 2.5       # Qualifications are key for matching
-        }
-        
-        # Initialize combined features column
-        job_df['combined_features'] = ''
+        return get_normalizer()(text)
+    
+    def preprocess_fields(self, job_df, n_jobs=1):
+        """Add *_processed columns, reusing cached output for postings whose text is unchanged
+
+        Postings that need preprocessing are sharded over n_jobs worker processes.
+        """
+        raw_rows = list(job_df[TEXT_FIELDS].itertuples(index=False, name=None))
         
-        # Apply weights by repeating text
-        for col, weight in weights.items():
-            if col in job_df.columns:
-                if weight > 1:
-                    repeated_text = job_df[col].apply(lambda x: ' '.join([str(x)] * int(weight)))
-                    job_df['combined_features'] += ' ' + repeated_text
+        if self.text_cache is None or job_df.empty:
+            processed = normalize_rows_parallel(raw_rows, n_jobs)
+        else:
+            job_ids = job_df['id'].tolist()
+            cached = self._read_text_cache(job_ids)
+            
+            processed = [None] * len(raw_rows)
+            misses = []
+            for i, (job_id, raw) in enumerate(zip(job_ids, raw_rows)):
+                digest = content_hash(raw)
+                hit = cached.get(job_id)
+                if hit is not None and hit[0] == digest:
+                    processed[i] = hit[1]
                 else:
-                    job_df['combined_features'] += ' ' + job_df[col].astype(str)
+                    misses.append((i, job_id, digest))
+            
+            fresh = normalize_rows_parallel([raw_rows[i] for i, _, _ in misses], n_jobs)
+            for (i, _, _), texts in zip(misses, fresh):
+                processed[i] = texts
+            
+            if misses:
+                self._write_text_cache([
+                    (job_id, digest, texts) for (_, job_id, digest), texts in zip(misses, fresh)
+                ])
         
-        # Clean up the combined features
-        job_df['combined_features'] = job_df['combined_features'].str.strip()
+        for i, field in enumerate(TEXT_FIELDS):
+            job_df[f'{field}_processed'] = [texts[i] for texts in processed]
         
         return job_df
     
-    def fit(self, jobs_data):
-        """Fit the recommendation model on job postings data"""
+    def _read_text_cache(self, job_ids):
+        try:
+            return self.text_cache.get_many(job_ids)
+        except Exception as e:
+            print(f"Processed text cache unavailable, preprocessing all jobs: {e}")
+            return {}
+    
+    def _write_text_cache(self, entries):
+        try:
+            self.text_cache.put_many(entries)
+        except Exception as e:
+            print(f"Could not update processed text cache: {e}")
+    
+    def field_texts(self, job_df):
+        """{field: processed texts} for a frame that went through preprocess_fields"""
+        return {field: job_df[f'{field}_processed'].tolist() for field in TEXT_FIELDS}
+    
+    @staticmethod
+    def job_to_dict(job):
+        """Convert a JobPosting (or an already-built dict) into a recommender row"""
+        if isinstance(job, dict):
+            return job
+        return job.to_recommender_row()
+    
+    def prepare_job_frame(self, jobs_data):
+        """Build a clean DataFrame from job objects, dicts or an existing DataFrame"""
         # Convert jobs_data to a DataFrame if it's not already
         if not isinstance(jobs_data, pd.DataFrame):
-            # Create DataFrame from list of job objects
-            job_df = pd.DataFrame([{
-                'id': job.id,
-                'title': job.title,
-                'description': job.description,
-                'category': job.category,
-                'subcategory': job.subcategory,
-                'role': job.role,
-                'location': job.location,
-                'company_name': job.company.name,
-                'qualification': job.qualification,
-                'salary': job.salary,
-                'job_type': job.job_type
-            } for job in jobs_data])
+            job_df = pd.DataFrame([self.job_to_dict(job) for job in jobs_data])
         else:
             job_df = jobs_data.copy()
         
         # Ensure all required columns exist
-        for col in ['title', 'description', 'category', 'role']:
+        for col in ['id', 'title', 'description', 'category', 'role', 'qualification']:
             if col not in job_df.columns:
                 job_df[col] = ''
         
         # Fill NaN values
-        job_df = job_df.fillna('')
+        return job_df.fillna('')
+    
+    def fit(self, jobs_data, n_jobs=1):
+        """Fit the recommendation model on job postings data
+
+        n_jobs worker processes preprocess the job text (1 = serial, -1 = all cores).
+        """
+        job_df = self.prepare_job_frame(jobs_data)
         
-        # Create combined features
-        job_df = self.create_combined_features(job_df)
+        # Preprocess every text field
+        job_df = self.preprocess_fields(job_df, n_jobs=n_jobs)
         
-        # Create and fit TF-IDF Vectorizer
-        self.vectorizer = TfidfVectorizer(
-            max_features=10000,
-            ngram_range=(1, 2),
-            min_df=1,
-            max_df=0.85,
-            sublinear_tf=True
-        )
+        # Fit one TF-IDF vectorizer per field and stack the weighted field blocks
+        self.vectorizer = FieldWeightedVectorizer(self.field_weights, self.vectorizer_factory())
+        matrix = self.vectorizer.fit_transform(self.field_texts(job_df))
+        
+        # Keep only compact metadata; the raw and processed text goes with job_df
+        return self._finish_fit(matrix, JobStore.from_frame(job_df))
+    
+    def fit_stream(self, chunks, n_jobs=1, max_terms=STREAM_MAX_TERMS, spool_dir=None):
+        """Fit on an iterable of job chunks (frames, dicts or JobPostings) in bounded memory
+        
+        The first pass preprocesses each chunk, counts its terms and spools the
+        processed text to a temporary file; the second pass reads the spool back
+        and vectorizes it chunk by chunk. Peak memory is one chunk plus the
+        vocabulary counts and the finished matrix, whatever the corpus size.
+        The result matches fit() on the same jobs (see TermCounter for the
+        max_terms caveat). Leaves the recommender unfitted when there are no jobs.
+        """
+        if self.engine == 'hashing':
+            counters = {field: self.vectorizer_factory()() for field in self.field_weights}
+        else:
+            counters = {field: TermCounter(max_terms) for field in self.field_weights}
+        stores = []
+        
+        with tempfile.TemporaryFile(dir=spool_dir) as spool:
+            for chunk in chunks:
+                job_df = self.preprocess_fields(self.prepare_job_frame(chunk), n_jobs=n_jobs)
+                if job_df.empty:
+                    continue
+                field_texts = self.field_texts(job_df)
+                for field, counter in counters.items():
+                    counter.partial_fit(field_texts[field])
+                pickle.dump(field_texts, spool, protocol=pickle.HIGHEST_PROTOCOL)
+                
+                # Collected per chunk and concatenated once (labels grow chunk to chunk)
+                stores.append(JobStore.from_frame(job_df, stores[-1].labels if stores else None))
+            
+            if not stores:
+                return self
+            
+            if self.engine == 'hashing':
+                vectorizers = counters
+            else:
+                vectorizers = {field: counter.vectorizer() for field, counter in counters.items()}
+            self.vectorizer = FieldWeightedVectorizer(self.field_weights, self.vectorizer_factory()).restore(
+                {field: None if vectorizer is None else len(vectorizer.idf_) for field, vectorizer in vectorizers.items()},
+                lambda field, start, width: vectorizers[field]
+            )
+            
+            spool.seek(0)
+            blocks = [self.vectorizer.transform(pickle.load(spool)) for _ in stores]
+        
+        return self._finish_fit(sp.vstack(blocks, format='csr'), JobStore.concat_all(stores))
+    
+    def _finish_fit(self, matrix, jobs):
+        """Install freshly fitted weighted rows and their job metadata"""
+        self.inverted_index = None
+        self.jobs = jobs
+        
+        # Remember document frequencies so incremental updates can keep IDF current
+        self.doc_freq = np.bincount(matrix.indices, minlength=matrix.shape[1])
+        self.n_docs = self.fitted_docs = matrix.shape[0]
+        self.changes_since_fit = 0
+        self.model_version = next(_model_versions)
+        
+        # Derived indexes are built from the full-precision rows
+        self.lsa = None
+        if self.lsa_components:
+            self.lsa = LatentSemanticIndex.fit(matrix, self.lsa_components)
+        self.tfidf_matrix, self.row_scales = self._compact(matrix)
+        
+        return self
+    
+    def _compact(self, matrix):
+        return compact_rows(matrix, self.index_dtype, self.max_terms_per_job)
+    
+    def vectorizer_factory(self):
+        """Per-field vectorizer constructor for the selected engine"""
+        if self.engine == 'hashing':
+            return partial(HashingTfidfVectorizer, self.hashing_features)
+        return make_tfidf_vectorizer
+    
+    @property
+    def drift(self):
+        """Fraction of the fitted corpus changed since the last full fit"""
+        return self.changes_since_fit / max(self.fitted_docs, 1)
+    
+    @property
+    def needs_refit(self):
+        """True once incremental changes have drifted too far from the fitted vocabulary
+
+        Also applies to the hashing engine: it has no vocabulary to go stale, but rows
+        indexed earlier keep the IDF weights they were vectorized with.
+        """
+        return self.drift > self.refit_threshold
+    
+    @property
+    def jobs(self):
+        return self._jobs
+    
+    @jobs.setter
+    def jobs(self, jobs):
+        self._jobs = jobs
+        self._job_rows = None if jobs is None else job_row_index(jobs.ids)
+    
+    @property
+    def job_ids(self):
+        """Job id of every tfidf_matrix row"""
+        return None if self._jobs is None else self._jobs.ids
+    
+    def rows_for_jobs(self, job_ids):
+        """tfidf_matrix row of every job id (-1 for jobs not in the index)"""
+        job_ids = np.asarray(job_ids, dtype=np.int64)
+        rows = np.full(len(job_ids), -1, dtype=np.int64)
+        known = (job_ids >= 0) & (job_ids < len(self._job_rows))
+        rows[known] = self._job_rows[job_ids[known]]
+        return rows
+    
+    def _row_for_job(self, job_id):
+        row = self.rows_for_jobs([job_id])[0]
+        return None if row < 0 else row
+    
+    def _update_idf(self, counts, sign):
+        """Add (sign=1) or remove (sign=-1) documents from the IDF statistics"""
+        self.doc_freq = self.doc_freq + sign * np.bincount(counts.indices, minlength=len(self.doc_freq))
+        self.n_docs += sign * counts.shape[0]
+        self.vectorizer.set_doc_freq(self.doc_freq, self.n_docs)
+        self.model_version = next(_model_versions)
+    
+    def _weight_counts(self, counts):
+        """Turn raw term counts into weighted TF-IDF rows using the current IDF"""
+        return self.vectorizer.weight_counts(counts)
+    
+    def _vectorize_new_jobs(self, job_df):
+        """Preprocess postings and count their terms with the fixed vocabulary"""
+        job_df = self.preprocess_fields(job_df)
+        return job_df, self.vectorizer.count(self.field_texts(job_df))
+    
+    def copy(self):
+        """Copy for incremental updates (add_jobs/update_job/remove_job) to patch
+        
+        The updates replace arrays rather than writing into them, so the copy
+        shares them with this model; only the vectorizer, whose IDF they reset,
+        is copied. Readers of this model never see a half-patched index.
+        """
+        clone = copy.copy(self)
+        clone.vectorizer = self.vectorizer.copy()
+        return clone
+    
+    def add_jobs(self, jobs_data):
+        """Append new postings to the fitted index without refitting the vocabulary"""
+        if self.tfidf_matrix is None:
+            raise ValueError("Model not fitted. Call fit() first with job data.")
+        
+        job_df = self.prepare_job_frame(jobs_data)
+        if job_df.empty:
+            return self
+        
+        job_df, counts = self._vectorize_new_jobs(job_df)
+        self._update_idf(counts, 1)
+        
+        rows = self._weight_counts(counts)
+        if self.lsa is not None:
+            self.lsa = self.lsa.append(rows)
+        rows, scales = self._compact(rows)
+        self.tfidf_matrix = sp.vstack([self.tfidf_matrix, rows], format='csr')
+        if self.row_scales is not None:
+            self.row_scales = np.concatenate([self.row_scales, scales])
+        self.inverted_index = None
+        self.jobs = self.jobs.concat(JobStore.from_frame(job_df, self.jobs.labels))
+        self.changes_since_fit += len(job_df)
+        
+        return self
+    
+    def update_job(self, job):
+        """Replace the indexed row of an edited posting (adding or removing it as needed)"""
+        job_row = self.job_to_dict(job)
+        idx = self._row_for_job(job_row['id'])
+        
+        if not job_row.get('is_active', True):
+            return self.remove_job(job_row['id'])
+        if idx is None:
+            return self.add_jobs([job_row])
+        
+        job_df, counts = self._vectorize_new_jobs(self.prepare_job_frame([job_row]))
         
-        self.tfidf_matrix = self.vectorizer.fit_transform(job_df['combined_features'])
-        self.job_dataframe = job_df
+        # Swap the old posting's document frequencies for the new ones
+        old_counts = self.tfidf_matrix[idx]
+        self._update_idf(old_counts, -1)
+        self._update_idf(counts, 1)
+        
+        row = self._weight_counts(counts)
+        if self.lsa is not None:
+            self.lsa = self.lsa.replace(idx, row)
+        row, scales = self._compact(row)
+        self.tfidf_matrix = sp.vstack([
+            self.tfidf_matrix[:idx],
+            row,
+            self.tfidf_matrix[idx + 1:]
+        ], format='csr')
+        if self.row_scales is not None:
+            self.row_scales = np.concatenate([self.row_scales[:idx], scales, self.row_scales[idx + 1:]])
+        self.inverted_index = None
+        self.jobs = self.jobs.replace(idx, JobStore.from_frame(job_df, self.jobs.labels))
+        self.changes_since_fit += 1
         
         return self
     
-    def get_recommendations_for_graduate(self, graduate, top_n=5):
-        """Get job recommendations for a graduate based on their profile"""
-        if self.tfidf_matrix is None or self.job_dataframe is None:
+    def remove_job(self, job_id):
+        """Drop a deactivated posting from the index"""
+        idx = self._row_for_job(job_id)
+        if idx is None:
+            return self
+        
+        self._update_idf(self.tfidf_matrix[idx], -1)
+        
+        keep = np.ones(self.tfidf_matrix.shape[0], dtype=bool)
+        keep[idx] = False
+        self.tfidf_matrix = self.tfidf_matrix[keep]
+        if self.row_scales is not None:
+            self.row_scales = self.row_scales[keep]
+        self.inverted_index = None
+        if self.lsa is not None:
+            self.lsa = self.lsa.take(keep)
+        self.jobs = self.jobs.take(keep)
+        self.changes_since_fit += 1
+        
+        return self
+    
+    def save(self, path):
+        """Write the fitted model to directory path as raw .npy arrays plus meta.json
+        
+        The directory is written next to path and renamed into place, so readers
+        never see a partial model. Load it with JobRecommender.load().
+        """
+        if self.tfidf_matrix is None:
             raise ValueError("Model not fitted. Call fit() first with job data.")
         
-        # Create a more comprehensive profile representation
+        arrays = {
+            'data': self.tfidf_matrix.data,
+            'indices': self.tfidf_matrix.indices,
+            'indptr': self.tfidf_matrix.indptr,
+            'idf': self.vectorizer.idf_,
+            'doc_freq': self.doc_freq,
+            **self.jobs.arrays(),
+        }
+        if self.engine == 'tfidf':
+            arrays['vocabulary'], arrays['vocabulary_offsets'] = self.vectorizer.vocabulary_blob()
+        if self.lsa is not None:
+            arrays['lsa_projection'], arrays['lsa_embeddings'] = self.lsa.projection, self.lsa.embeddings
+        if self.row_scales is not None:
+            arrays['row_scales'] = self.row_scales
+        
+        meta = {
+            'format': MODEL_FORMAT,
+            'engine': self.engine,
+            'hashing_features': self.hashing_features,
+            'lsa_components': self.lsa_components,
+            'has_lsa': self.lsa is not None,
+            'index_dtype': self.index_dtype,
+            'max_terms_per_job': self.max_terms_per_job,
+            'field_weights': self.vectorizer.weights,
+            'widths': self.vectorizer.widths(),
+            'shape': list(self.tfidf_matrix.shape),
+            'n_docs': int(self.n_docs),
+            'fitted_docs': int(self.fitted_docs),
+            'changes_since_fit': int(self.changes_since_fit),
+            'labels': self.jobs.labels,
+        }
+        
+        path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.tmp-', dir=os.path.dirname(path))
+        try:
+            for name, array in arrays.items():
+                np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(array))
+            with open(os.path.join(staging, 'meta.json'), 'w') as f:
+                json.dump(meta, f)
+            
+            if os.path.exists(path):
+                shutil.rmtree(path)
+            os.rename(staging, path)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        
+        return path
+    
+    @classmethod
+    def load(cls, path, mmap=True, **kwargs):
+        """Load a model written by save(); kwargs go to the constructor
+        
+        With mmap=True the arrays are memory-mapped read-only, so every process
+        loading the same directory shares one copy through the page cache.
+        Incremental updates still work: they build new arrays in process memory.
+        """
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta['format'] != MODEL_FORMAT:
+            raise ValueError(f"Unsupported model format {meta['format']} in {path}")
+        
+        mmap_mode = 'r' if mmap else None
+        def array(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+        
+        recommender = cls(
+            field_weights=meta['field_weights'],
+            engine=meta['engine'],
+            hashing_features=meta['hashing_features'],
+            lsa_components=meta.get('lsa_components'),
+            index_dtype=meta.get('index_dtype', 'float64'),
+            max_terms_per_job=meta.get('max_terms_per_job'),
+            **kwargs
+        )
+        doc_freq, idf = array('doc_freq'), array('idf')
+        n_docs = meta['n_docs']
+        
+        if recommender.engine == 'hashing':
+            def make_vectorizer(field, start, width):
+                vectorizer = HashingTfidfVectorizer(width)
+                vectorizer.doc_freq_ = doc_freq[start:start + width]
+                vectorizer.n_docs_ = n_docs
+                return vectorizer
+        else:
+            blob, offsets = array('vocabulary'), array('vocabulary_offsets')
+            def make_vectorizer(field, start, width):
+                return CompactTfidfVectorizer(blob, offsets[start:start + width + 1], idf[start:start + width])
+        
+        recommender.vectorizer = FieldWeightedVectorizer(
+            recommender.field_weights, recommender.vectorizer_factory()
+        ).restore(meta['widths'], make_vectorizer)
+        
+        recommender.tfidf_matrix = sp.csr_matrix(
+            (array('data'), array('indices'), array('indptr')), shape=tuple(meta['shape'])
+        )
+        recommender.jobs = JobStore.from_arrays(array, meta['labels'])
+        if recommender.index_dtype == 'uint8':
+            recommender.row_scales = array('row_scales')
+        if meta.get('has_lsa'):
+            recommender.lsa = LatentSemanticIndex(array('lsa_projection'), array('lsa_embeddings'))
+        recommender.doc_freq = doc_freq
+        recommender.n_docs = n_docs
+        recommender.fitted_docs = meta['fitted_docs']
+        recommender.changes_since_fit = meta['changes_since_fit']
+        
+        return recommender
+    
+    @staticmethod
+    def profile_text(graduate):
+        """Comprehensive profile text for a graduate ('' when the profile is empty)"""
         profile_parts = []
         if graduate.skills:
             profile_parts.append(graduate.skills)
@@ -159,68 +1631,411 @@ class JobRecommender:
             profile_parts.append(graduate.experience)
         if graduate.location_preference:
             profile_parts.append(graduate.location_preference)
+        return " ".join(profile_parts)
+    
+    def profile_vectors(self, graduates):
+        """Weighted TF-IDF row per graduate (None for empty profiles)
+        
+        Vectors for unchanged profiles come from profile_cache; the rest are
+        preprocessed and transformed together.
+        """
+        vectors = [None] * len(graduates)
+        misses = []
+        
+        for i, graduate in enumerate(graduates):
+            graduate_profile = self.profile_text(graduate)
+            if not graduate_profile:
+                continue
+            
+            key = getattr(graduate, 'id', None)
+            fingerprint = content_hash([graduate_profile])
+            if self.profile_cache is not None and key is not None:
+                vectors[i] = self.profile_cache.get(key, fingerprint, self.model_version)
+            if vectors[i] is None:
+                misses.append((i, key, fingerprint, graduate_profile))
+        
+        if misses:
+            # Preprocess the profile texts and transform them into TF-IDF space
+            processed_profiles = [self.preprocess_text(graduate_profile) for _, _, _, graduate_profile in misses]
+            profile_matrix = self.vectorizer.transform_query(processed_profiles)
             
+            for row, (i, key, fingerprint, _) in enumerate(misses):
+                vectors[i] = profile_matrix[row]
+                if self.profile_cache is not None and key is not None:
+                    self.profile_cache.put(key, fingerprint, self.model_version, vectors[i])
+        
+        return vectors
+    
+    def profile_vector(self, graduate):
+        """Weighted TF-IDF row for a graduate's profile, or None when the profile is empty"""
+        return self.profile_vectors([graduate])[0]
+    
+    def profile_embeddings(self, graduates):
+        """LSA embedding per graduate as one float32 matrix (zero rows for empty profiles)"""
+        if self.lsa is None:
+            raise ValueError("LSA mode is off. Create the recommender with lsa_components.")
+        
+        graduates = list(graduates)
+        vectors = self.profile_vectors(graduates)
+        n_features = self.tfidf_matrix.shape[1]
+        profile_matrix = sp.vstack([
+            vector if vector is not None else sp.csr_matrix((1, n_features)) for vector in vectors
+        ], format='csr') if vectors else sp.csr_matrix((0, n_features))
+        return self.lsa.project(profile_matrix)
+    
+    def job_vector(self, job_id):
+        """A job's weighted row (1 x n_features, dequantized), or None for jobs not in the index"""
+        idx = self._row_for_job(job_id)
+        if idx is None:
+            return None
+        row = self.tfidf_matrix[idx].astype(np.float32)
+        if self.row_scales is not None:
+            row = row * self.row_scales[idx]
+        return row
+    
+    def graduate_index(self, graduates):
+        """GraduateIndex of the given graduates' profile vectors"""
+        graduates = list(graduates)
+        n_features = self.tfidf_matrix.shape[1]
+        vectors = [
+            vector if vector is not None else sp.csr_matrix((1, n_features))
+            for vector in self.profile_vectors(graduates)
+        ]
+        matrix = sp.vstack(vectors, format='csr') if vectors else sp.csr_matrix((0, n_features))
+        return GraduateIndex(self.vectorizer, matrix.astype(np.float32), [graduate.id for graduate in graduates])
+    
+    def rank_graduates(self, graduate_index, job_id, top_n=10, graduate_ids=None):
+        """Best-matching graduates for a job, as [{'graduate_id', 'similarity_score'}]
+        
+        graduate_ids restricts the ranking (e.g. to a posting's applicants).
+        Scores are percentages like get_recommendations_for_graduate's.
+        """
+        job_vector = self.job_vector(job_id)
+        if job_vector is None:
+            return []
+        return [
+            {'graduate_id': graduate_id, 'similarity_score': score * 100}
+            for graduate_id, score in graduate_index.top_k(job_vector, top_n, graduate_ids)
+        ]
+    
+    def get_recommendations_for_graduate(self, graduate, top_n=5, job_filter=None, co_scores=None,
+                                         explain_terms=0):
+        """Get job recommendations for a graduate based on their profile
+        
+        job_filter (a JobFilter) restricts the candidates before scoring.
+        co_scores (one per job row) are blended into the content scores and
+        explain_terms adds that many 'matching_terms' to each recommendation.
+        """
+        if self.tfidf_matrix is None or self.jobs is None:
+            raise ValueError("Model not fitted. Call fit() first with job data.")
+        
+        graduate_vector = self.profile_vector(graduate)
+        
         # If no profile information is available, return empty list
-        if not profile_parts:
+        if graduate_vector is None:
             return []
-            
-        graduate_profile = " ".join(profile_parts)
         
-        # Preprocess the graduate profile text
-        processed_profile = self.preprocess_text(graduate_profile)
+        return self.recommend_for_vector(graduate_vector, top_n, job_filter, co_scores, explain_terms)
+    
+    def eligible_rows(self, job_filter):
+        """Rows a JobFilter admits, or None when every row is eligible"""
+        if job_filter is None or job_filter.is_open:
+            return None
+        return np.flatnonzero(job_filter.mask(self.jobs))
+    
+    def _blend(self, scores, co_scores):
+        """Weighted mean of content and co-application scores
         
-        # Transform the graduate profile into TF-IDF space
-        graduate_vector = self.vectorizer.transform([processed_profile])
+        Rows without any co-application signal keep their content scores.
+        """
+        if co_scores is None or not self.co_application_weight:
+            return scores
+        total = self.content_weight + self.co_application_weight
+        blended = (self.content_weight * scores + self.co_application_weight * co_scores) / total
+        return np.where(co_scores.any(axis=-1, keepdims=True), blended, scores)
+    
+    def recommend_for_vector(self, graduate_vector, top_n=5, job_filter=None, co_scores=None, explain_terms=0):
+        """Rank jobs for an already vectorized (L2-normalized) profile
         
-        # Calculate cosine similarities
-        cosine_similarities = cosine_similarity(graduate_vector, self.tfidf_matrix).flatten()
+        co_scores, one per job row, are blended into the content scores. With
+        explain_terms, each recommendation lists that many 'matching_terms'.
+        """
+        if graduate_vector.nnz == 0:
+            return []
         
-        # Get indices of top matches with non-zero similarity
-        top_indices = cosine_similarities.argsort()[:-top_n-1:-1]
+        # Constrained queries only score the eligible rows
+        rows = self.eligible_rows(job_filter)
+        if rows is not None:
+            if self.lsa is not None:
+                scores = self.lsa.embeddings[rows] @ self.lsa.project(graduate_vector).ravel()
+            else:
+                scores = self._job_scores(graduate_vector, rows)
+            scores = self._blend(scores, None if co_scores is None else co_scores[rows])
+            top = top_k_indices(scores, top_n)
+            top_rows, top_scores = rows[top], scores[top]
         
-        # Filter out zero similarity matches
-        recommendations = []
-        for idx in top_indices:
-            similarity_score = cosine_similarities[idx]
-            if similarity_score > 0:
-                job_id = self.job_dataframe.iloc[idx]['id']
-                recommendations.append({
-                    'job_id': job_id,
-                    'similarity_score': float(similarity_score * 100)  # Convert to percentage
-                })
+        # LSA mode: one dense float32 matrix-vector product over the embeddings
+        elif self.lsa is not None:
+            scores = self._blend(self.lsa.scores(graduate_vector), co_scores)
+            top_rows = top_k_indices(scores, top_n)
+            top_scores = scores[top_rows]
         
+        # Large corpora: only score jobs sharing terms with the profile (content only)
+        elif self._use_inverted_index() and (co_scores is None or not self.co_application_weight):
+            if self.inverted_index is None:
+                self.inverted_index = InvertedIndex(self.weighted_rows())
+            top_rows, top_scores = self.inverted_index.top_k(graduate_vector, top_n)
+        
+        # Job rows and the profile are L2-normalized, so one sparse matrix-vector
+        # product gives every cosine similarity in O(nnz)
+        else:
+            scores = self._blend(self._job_scores(graduate_vector), co_scores)
+            top_rows = top_k_indices(scores, top_n)
+            top_scores = scores[top_rows]
+        
+        terms = None
+        if explain_terms:
+            profiles = graduate_vector[np.zeros(len(top_rows), dtype=np.intp)]
+            terms = self.matching_terms(profiles, top_rows, explain_terms)
+        return self._format_recommendations(top_rows, top_scores, terms)
+    
+    def matching_terms(self, profiles, rows, n_terms=5):
+        """Top contributing terms of each (profile, job row) pair, best first
+        
+        profiles holds one profile row per pair. The contributions are the
+        products of the weights the profile and the job's row share, i.e. the
+        terms of their dot product. All pairs are ranked at once: the heaviest
+        few columns of each pair are looked up (each distinct column once), a
+        term's weights in different fields add up and each pair keeps its
+        n_terms heaviest terms.
+        """
+        jobs, profiles = self.tfidf_matrix[rows], profiles.tocsr()
+        n_pairs, n_columns = jobs.shape
+        
+        # Entries both rows hold, matched on pair * n_columns + column keys
+        job_keys = np.repeat(np.arange(n_pairs), np.diff(jobs.indptr)) * n_columns + jobs.indices
+        profile_keys = np.repeat(np.arange(n_pairs), np.diff(profiles.indptr)) * n_columns + profiles.indices
+        keys, job_at, profile_at = np.intersect1d(job_keys, profile_keys, assume_unique=True, return_indices=True)
+        pairs = keys // n_columns
+        data = jobs.data[job_at] * profiles.data[profile_at]
+        
+        # The heaviest 3 * n_terms columns of each pair decide its top terms
+        heaviest = _rank_within_groups(pairs, data) < 3 * n_terms
+        pairs, data = pairs[heaviest], data[heaviest]
+        columns, inverse = np.unique(jobs.indices[job_at[heaviest]], return_inverse=True)
+        
+        # Sum each pair's weights per term (hashed columns have none)
+        term_ids = {}
+        column_terms = np.array([
+            -1 if name is None else term_ids.setdefault(name, len(term_ids))
+            for name in self.vectorizer.term_names(columns)
+        ], dtype=np.int64)[inverse]
+        named = column_terms >= 0
+        keys, key_rows = np.unique(pairs[named] * len(term_ids) + column_terms[named], return_inverse=True)
+        weights = np.bincount(key_rows, weights=data[named], minlength=len(keys))
+        pairs, terms = np.divmod(keys, max(len(term_ids), 1))
+        
+        # Each pair's n_terms heaviest terms, grouped by pair and best first
+        rank = _rank_within_groups(pairs, weights)
+        top = np.flatnonzero(rank < n_terms)
+        top = top[np.lexsort((rank[top], pairs[top]))]
+        names = np.array(list(term_ids), dtype=object)[terms[top]]
+        return [chunk.tolist() for chunk in np.split(names, np.cumsum(np.bincount(pairs[top], minlength=n_pairs))[:-1])]
+    
+    def _job_scores(self, graduate_vector, rows=None):
+        """Cosine similarity of every job row (or the given rows) to one profile row"""
+        matrix = self.tfidf_matrix if rows is None else self.tfidf_matrix[rows]
+        
+        # Match a float index's precision so the product does not upcast (copy) the
+        # matrix; a uint8 index is upcast to float32 on every product
+        query_dtype = np.float64 if self.index_dtype == 'float64' else np.float32
+        scores = matrix @ graduate_vector.toarray().ravel().astype(query_dtype)
+        if self.row_scales is not None:
+            scores *= self.row_scales if rows is None else self.row_scales[rows]
+        return scores
+    
+    def weighted_rows(self):
+        """Job rows with their (dequantized) weights, for indexes built from the matrix"""
+        if self.row_scales is None:
+            return self.tfidf_matrix
+        return sp.csr_matrix(
+            (self.tfidf_matrix.data * np.repeat(self.row_scales, np.diff(self.tfidf_matrix.indptr)),
+             self.tfidf_matrix.indices, self.tfidf_matrix.indptr),
+            shape=self.tfidf_matrix.shape
+        )
+    
+    def similar_jobs(self, k=10, job_ids=None, chunk_size=None):
+        """Yield (job_id, neighbor_ids, scores) with each job's k most similar jobs
+
+        Cosine similarity of the TF-IDF rows (also in LSA mode), best first,
+        dropping the job itself and zero-similarity jobs. Covers every indexed
+        job, or the given job_ids (ids without a row are skipped). Rows are
+        multiplied against the whole matrix chunk_size at a time so the dense
+        score block stays bounded in memory.
+        """
+        if self.tfidf_matrix is None or self.jobs is None:
+            raise ValueError("Model not fitted. Call fit() first with job data.")
+
+        matrix = self.weighted_rows()
+        if self.index_dtype != 'float64':
+            matrix = matrix.astype(np.float32)
+        matrix_t = matrix.T.tocsc()
+
+        if job_ids is None:
+            rows = np.arange(matrix.shape[0])
+        else:
+            rows = self.rows_for_jobs(job_ids)
+            rows = rows[rows >= 0]
+
+        n_jobs = matrix.shape[0]
+        if chunk_size is None:
+            chunk_size = max(1, MAX_SCORE_CELLS // max(n_jobs, 1))
+
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            scores = (matrix[chunk] @ matrix_t).toarray()
+            scores[np.arange(len(chunk)), chunk] = -np.inf
+            top = top_k_indices(scores, k)
+
+            for i, row in enumerate(chunk):
+                neighbor_scores = scores[i, top[i]]
+                keep = neighbor_scores > 0
+                yield self.job_ids[row], self.job_ids[top[i][keep]], neighbor_scores[keep]
+
+    def job_similarities(self, job_ids):
+        """(n_jobs x len(job_ids)) cosine similarities of every job row to the given jobs
+
+        Columns of ids without a row are all zero.
+        """
+        rows = self.rows_for_jobs(job_ids)
+        matrix = self.weighted_rows()
+        if self.index_dtype != 'float64':
+            matrix = matrix.astype(np.float32)
+
+        scores = np.zeros((matrix.shape[0], len(rows)), dtype=matrix.dtype)
+        present = np.flatnonzero(rows >= 0)
+        if len(present):
+            scores[:, present] = (matrix @ matrix[rows[present]].T).toarray()
+        return scores
+
+    def _use_inverted_index(self):
+        return (self.inverted_index_min_jobs is not None
+                and self.tfidf_matrix.shape[0] >= self.inverted_index_min_jobs)
+    
+    def _format_recommendations(self, rows, row_scores, terms=None):
+        """Recommendation dicts for the selected rows, dropping zero-similarity matches"""
+        recommendations = []
+        for i, (idx, score) in enumerate(zip(rows, row_scores)):
+            if score > 0:
+                recommendation = {
+                    'job_id': self.job_ids[idx],
+                    'similarity_score': float(score * 100)  # Convert to percentage
+                }
+                if terms is not None:
+                    recommendation['matching_terms'] = terms[i]
+                recommendations.append(recommendation)
         return recommendations
     
-    def get_similarity_between_job_and_graduate(self, job_id, graduate):
-        """Calculate similarity score between a specific job and a graduate"""
-        if self.tfidf_matrix is None or self.job_dataframe is None:
+    def recommend_batch(self, graduates, top_n=5, chunk_size=None, job_filter=None, co_scores=None,
+                        explain_terms=0):
+        """Get job recommendations for many graduates with one sparse matrix product
+        
+        Returns {graduate_id: recommendations} in the same format as
+        get_recommendations_for_graduate. Profiles are scored against the job
+        matrix in row chunks so the dense score block stays bounded in memory.
+        job_filter applies to every graduate of the batch. co_scores, when given,
+        is called with each chunk's graduate ids and returns their
+        co-application scores (one row per graduate, one column per job row).
+        With explain_terms, each recommendation lists that many 'matching_terms',
+        computed for the whole chunk with one elementwise product.
+        """
+        if self.tfidf_matrix is None or self.jobs is None:
             raise ValueError("Model not fitted. Call fit() first with job data.")
         
-        # Find the job in the dataframe
-        job_idx = self.job_dataframe[self.job_dataframe['id'] == job_id].index
+        graduates = list(graduates)
+        results = {graduate.id: [] for graduate in graduates}
+        vectors = self.profile_vectors(graduates)
+        graduate_ids = [graduate.id for graduate, vector in zip(graduates, vectors) if vector is not None]
         
-        if len(job_idx) == 0:
-            return 0.0  # Job not found
+        if not graduate_ids:
+            return results
         
-        job_idx = job_idx[0]
+        # All profiles in TF-IDF space at once; rows are L2-normalized like the
+        # job rows, so a plain dot product is the cosine similarity
+        profile_matrix = sp.vstack([vector for vector in vectors if vector is not None], format='csr')
         
-        # Create a profile representation for the graduate
-        graduate_profile = f"{graduate.skills} {graduate.experience}"
+        # Score only the rows the filter admits; results map back through rows
+        job_matrix, row_scales = self.tfidf_matrix, self.row_scales
+        embeddings = None if self.lsa is None else self.lsa.embeddings
+        rows = self.eligible_rows(job_filter)
+        if rows is None:
+            rows = np.arange(job_matrix.shape[0])
+        else:
+            job_matrix = job_matrix[rows]
+            row_scales = None if row_scales is None else row_scales[rows]
+            embeddings = None if embeddings is None else embeddings[rows]
         
-        # Add location preference if available
-        if graduate.location_preference:
-            graduate_profile += f" {graduate.location_preference}"
+        if self.lsa is not None:
+            profile_embeddings = self.lsa.project(profile_matrix)
+        else:
+            job_matrix_t = job_matrix.T.tocsc()
+            if self.index_dtype != 'float64':
+                profile_matrix = profile_matrix.astype(np.float32)
         
-        # Preprocess the graduate profile text
-        processed_profile = self.preprocess_text(graduate_profile)
+        n_jobs = len(rows)
+        if chunk_size is None:
+            chunk_size = max(1, MAX_SCORE_CELLS // max(n_jobs, 1))
         
-        # Transform the graduate profile into TF-IDF space
-        graduate_vector = self.vectorizer.transform([processed_profile])
+        for start in range(0, len(graduate_ids), chunk_size):
+            if self.lsa is not None:
+                scores = profile_embeddings[start:start + chunk_size] @ embeddings.T
+            else:
+                scores = (profile_matrix[start:start + chunk_size] @ job_matrix_t).toarray()
+                if row_scales is not None:
+                    scores *= row_scales
+            if co_scores is not None:
+                scores = self._blend(scores, co_scores(graduate_ids[start:start + chunk_size])[:, rows])
+            top = top_k_indices(scores, top_n)
+            
+            terms = None
+            if explain_terms:
+                pairs = np.repeat(np.arange(start, start + len(top)), top.shape[1])
+                terms = self.matching_terms(profile_matrix[pairs], rows[top].ravel(), explain_terms)
+            
+            for row, graduate_id in enumerate(graduate_ids[start:start + chunk_size]):
+                row_terms = None if terms is None else terms[row * top.shape[1]:(row + 1) * top.shape[1]]
+                results[graduate_id] = self._format_recommendations(rows[top[row]], scores[row, top[row]], row_terms)
+        
+        return results
+    
+    def score_jobs(self, graduate, job_ids):
+        """Cosine similarity of a graduate to each given job, as {job_id: score}
+        
+        The profile is vectorized once and all scores come from one sparse
+        product over the selected rows. Jobs not in the index score 0.0.
+        """
+        if self.tfidf_matrix is None or self.jobs is None:
+            raise ValueError("Model not fitted. Call fit() first with job data.")
         
-        # Get the job vector
-        job_vector = self.tfidf_matrix[job_idx]
+        job_ids = list(job_ids)
+        scores = dict.fromkeys(job_ids, 0.0)
         
-        # Calculate cosine similarity
-        similarity = cosine_similarity(graduate_vector, job_vector.reshape(1, -1))[0][0]
+        graduate_vector = self.profile_vector(graduate)
+        if graduate_vector is None or not job_ids:
+            return scores
         
-        return similarity
\ No newline at end of file
+        rows = self.rows_for_jobs(job_ids)
+        found = rows >= 0
+        if self.lsa is not None:
+            # Embedding cosines can be negative; no shared signal counts as 0
+            similarities = np.maximum(self.lsa.embeddings[rows[found]] @ self.lsa.project(graduate_vector).ravel(), 0)
+        else:
+            similarities = self._job_scores(graduate_vector, rows[found])
+        
+        found_ids = [job_id for job_id, is_found in zip(job_ids, found) if is_found]
+        scores.update(zip(found_ids, similarities.tolist()))
+        return scores
+    
+    def get_similarity_between_job_and_graduate(self, job_id, graduate):
+        """Calculate similarity score between a specific job and a graduate"""
+        return self.score_jobs(graduate, [job_id])[job_id]
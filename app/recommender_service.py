@@ -0,0 +1,803 @@
+# Recommender model registry and database glue
+#
+# The recommendation engine (numpy, scikit-learn, NLTK) is imported on first
+# use, so workers that never build a recommender do not pay for it
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from types import SimpleNamespace
+from flask import current_app
+from sqlalchemy import delete, event, func, insert, select, update
+from app import db
+from app.models import (Application, Company, CorpusVersion, Graduate, JobNeighbor, JobPosting, ProcessedJobText,
+                        Recommendation)
+from app.text_processing import ensure_nltk_resources
+
+# Name of the corpus version row tracking active job postings
+JOB_CORPUS = 'jobs'
+
+# Name of the corpus version row tracking graduate profiles
+GRADUATE_CORPUS = 'graduates'
+
+# Name of the corpus version row tracking job applications
+APPLICATION_CORPUS = 'applications'
+
+# Saved model versions kept in RECOMMENDER_MODEL_DIR
+MODELS_KEPT = 3
+
+# Rows fetched per round trip when loading the job corpus
+JOB_LOAD_BATCH = 5000
+
+# Similar postings stored per job in the job_neighbors table
+JOB_NEIGHBORS = 10
+
+# Most neighbor lists an edit refreshes within its request; larger changes are
+# left to scripts/build_job_neighbors.py
+JOB_NEIGHBORS_MAX_AFFECTED = 500
+
+def get_corpus_version(name=JOB_CORPUS):
+    """Return the current version of a corpus (0 if it was never bumped)"""
+    version = db.session.query(CorpusVersion.version).filter_by(name=name).scalar()
+    return version or 0
+
+def bump_corpus_version(name=JOB_CORPUS):
+    """Increment a corpus version as part of the current transaction and return it"""
+    result = db.session.execute(
+        update(CorpusVersion)
+        .where(CorpusVersion.name == name)
+        .values(version=CorpusVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        db.session.add(CorpusVersion(name=name, version=1))
+        return 1
+    return get_corpus_version(name)
+
+def active_jobs_query():
+    """Columns of JobPosting.to_recommender_row() for every active posting
+    
+    Joins the companies table directly for the name (not the Company mapper,
+    which would also join users), so no ORM objects or per-company lazy loads.
+    """
+    companies = Company.__table__
+    return (
+        select(
+            JobPosting.id, JobPosting.title, JobPosting.description, JobPosting.category,
+            JobPosting.subcategory, JobPosting.role, JobPosting.location,
+            companies.c.name.label('company_name'), JobPosting.qualification, JobPosting.salary,
+            JobPosting.salary_min, JobPosting.salary_max, JobPosting.job_type, JobPosting.is_active
+        )
+        .join(companies, companies.c.id == JobPosting.company_id)
+        .where(JobPosting.is_active.is_(True))
+        .order_by(JobPosting.id)
+    )
+
+def load_active_jobs(batch_size=JOB_LOAD_BATCH):
+    """DataFrame of the active postings, read with one query streamed in batches"""
+    import pandas as pd
+    
+    result = db.session.execute(active_jobs_query().execution_options(yield_per=batch_size))
+    columns = list(result.keys())
+    return pd.DataFrame.from_records((tuple(row) for row in result), columns=columns)
+
+def graduate_profiles_query():
+    """Id and profile fields of every graduate (graduates table only, no ORM objects)"""
+    graduates = Graduate.__table__
+    return select(
+        graduates.c.id, graduates.c.skills, graduates.c.experience, graduates.c.location_preference
+    ).order_by(graduates.c.id)
+
+def iter_active_job_chunks(batch_size=JOB_LOAD_BATCH):
+    """The active postings as DataFrames of up to batch_size rows, read from a server-side cursor"""
+    import pandas as pd
+    
+    result = db.session.execute(active_jobs_query().execution_options(yield_per=batch_size))
+    columns = list(result.keys())
+    for rows in result.partitions():
+        yield pd.DataFrame.from_records([tuple(row) for row in rows], columns=columns)
+
+class ProcessedTextStore:
+    """Database cache of preprocessed job text, keyed by job id and a hash of the raw fields
+
+    Uses its own connection so cache writes never commit the request's session.
+    """
+
+    # Keep IN (...) lists to a size every database handles comfortably
+    chunk_size = 1000
+
+    def get_many(self, job_ids):
+        """Return {job_id: (content_hash, [processed field texts])} for cached jobs"""
+        from app.recommender import TEXT_FIELDS
+        table = ProcessedJobText.__table__
+        columns = [table.c.job_id, table.c.content_hash] + [table.c[field] for field in TEXT_FIELDS]
+        cached = {}
+
+        with db.engine.connect() as conn:
+            for start in range(0, len(job_ids), self.chunk_size):
+                chunk = job_ids[start:start + self.chunk_size]
+                for row in conn.execute(select(*columns).where(table.c.job_id.in_(chunk))):
+                    cached[row[0]] = (row[1], [text or '' for text in row[2:]])
+
+        return cached
+
+    def put_many(self, entries):
+        """Store freshly processed (job_id, content_hash, texts) entries"""
+        from app.recommender import TEXT_FIELDS
+        table = ProcessedJobText.__table__
+        rows = [
+            dict(job_id=job_id, content_hash=digest, updated_at=datetime.utcnow(), **dict(zip(TEXT_FIELDS, texts)))
+            for job_id, digest, texts in entries
+        ]
+
+        with db.engine.begin() as conn:
+            for start in range(0, len(rows), self.chunk_size):
+                chunk = rows[start:start + self.chunk_size]
+                conn.execute(delete(table).where(table.c.job_id.in_([row['job_id'] for row in chunk])))
+                conn.execute(insert(table), chunk)
+
+class ProfileVectorCache:
+    """Bounded LRU cache of transformed graduate profile vectors
+    
+    Entries are keyed by graduate id and only hit while both the fingerprint of
+    the profile text and the version of the model that vectorized it match, so
+    edited profiles and updated models miss instead of serving stale vectors.
+    The least recently used entry is evicted once max_size is exceeded.
+    """
+    
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key, fingerprint, model_version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[:2] == (fingerprint, model_version):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            return None
+    
+    def put(self, key, fingerprint, model_version, vector):
+        with self._lock:
+            self._entries[key] = (fingerprint, model_version, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, key):
+        """Drop one graduate's cached vector"""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    @property
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+class RecommenderRegistry:
+    """Holds one fitted JobRecommender per worker process, tagged with the job corpus version"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._recommender = None
+        self._version = None
+        self._reuse_saved = True
+        
+        # Profile vectors of every graduate for ranking candidates, built on first
+        # use and tagged with the graduate corpus version
+        self._graduate_index = None
+        self._graduate_version = None
+        
+        # Co-application counts of every job pair, built on first use and tagged
+        # with the application corpus version and the last application id folded in
+        self._co_index = None
+        self._co_version = None
+        self._co_last_id = 0
+        
+        # Shared by every model this registry builds; entries of replaced models
+        # stop matching (different model_version) and age out
+        self.profile_cache = ProfileVectorCache()
+
+    @property
+    def version(self):
+        return self._version
+
+    def get_recommender(self):
+        """Return the fitted recommender, refitting only when job postings have changed"""
+        version = get_corpus_version()
+        if version == self._version and not self._refit_due():
+            return self._recommender
+
+        with self._lock:
+            # Another thread may have refitted while we were waiting
+            if version != self._version or self._refit_due():
+                self._recommender = self._load_or_fit(version)
+                self._version = version
+            return self._recommender
+
+    def current_recommender(self):
+        """The loaded recommender if it matches the job corpus version, else None (never fits)"""
+        recommender = self._recommender
+        if recommender is None or self._version != get_corpus_version() or recommender.needs_refit:
+            return None
+        return recommender
+
+    def apply_job_changes(self, version, jobs):
+        """Patch the fitted index with committed job changes instead of refitting
+
+        Only applies when this worker's model is exactly one version behind, i.e.
+        nobody else changed the corpus in between; otherwise the next request refits.
+        The changes are made on a copy and published by swapping the reference, so
+        requests reading the current model never see a half-patched index.
+        """
+        with self._lock:
+            if self._recommender is None or self._version != version - 1:
+                return
+
+            try:
+                recommender = self._recommender.copy()
+                for job in jobs:
+                    recommender.update_job(job)
+            except Exception as e:
+                print(f"Incremental recommender update failed, scheduling refit: {e}")
+                self._recommender = None
+                self._version = None
+                return
+            
+            # The graduate index was built with the old IDF and stays usable, as it
+            # did when the vectorizer was patched in place
+            if self._graduate_index is not None and self._graduate_index.vectorizer is self._recommender.vectorizer:
+                self._graduate_index.vectorizer = recommender.vectorizer
+            self._recommender, self._version = recommender, version
+
+    def invalidate(self):
+        """Drop the cached model so the next request refits (ignoring saved models)"""
+        with self._lock:
+            self._recommender = None
+            self._version = None
+            self._reuse_saved = False
+            self._graduate_index = None
+    
+    def get_graduate_index(self):
+        """(recommender, GraduateIndex) for ranking graduates, or (None, None) without jobs
+        
+        The index is rebuilt when the model's vectorizer was refitted or another
+        worker changed a profile since it was built.
+        """
+        recommender = self.get_recommender()
+        if recommender is None:
+            return None, None
+        
+        version = get_corpus_version(GRADUATE_CORPUS)
+        with self._lock:
+            index = self._graduate_index
+            if (index is None or index.vectorizer is not recommender.vectorizer
+                    or self._graduate_version != version):
+                graduates = db.session.execute(graduate_profiles_query()).all()
+                index = self._graduate_index = recommender.graduate_index(graduates)
+                self._graduate_version = version
+            return recommender, index
+    
+    def apply_profile_changes(self, version, graduates):
+        """Swap committed profile edits into the graduate index (one version behind only)"""
+        with self._lock:
+            for graduate in graduates:
+                self.profile_cache.invalidate(graduate.id)
+            
+            index, recommender = self._graduate_index, self._recommender
+            if (index is None or recommender is None or index.vectorizer is not recommender.vectorizer
+                    or self._graduate_version != version - 1):
+                return
+            for graduate in graduates:
+                index.upsert(graduate.id, recommender.profile_vector(graduate))
+            self._graduate_version = version
+
+    def get_co_application_index(self):
+        """CoApplicationIndex of every application, catching up on other workers' applications
+        
+        Built from the whole table once; after that only applications newer than
+        the last one folded in are read and added.
+        """
+        import numpy as np
+        from app.recommender import CoApplicationIndex
+        
+        version = get_corpus_version(APPLICATION_CORPUS)
+        with self._lock:
+            if self._co_index is None:
+                rows = np.array(
+                    db.session.execute(select(Application.graduate_id, Application.job_id, Application.id)).all(),
+                    dtype=np.int64
+                ).reshape(-1, 3)
+                self._co_index = CoApplicationIndex.build(rows[:, 0], rows[:, 1])
+                self._co_last_id = int(rows[:, 2].max()) if len(rows) else 0
+                self._co_version = version
+            elif self._co_version != version:
+                for application_id, job_id, other_job_ids in applications_since(self._co_last_id):
+                    self._co_index.add(job_id, other_job_ids)
+                    self._co_last_id = application_id
+                self._co_version = version
+            return self._co_index
+    
+    def apply_applications(self, version, applications):
+        """Add committed (application_id, job_id, other applied job ids) applications to the index (one version behind only)
+        
+        Applications already folded in (an index built from the table while they
+        committed) are skipped, so none is counted twice.
+        """
+        with self._lock:
+            if self._co_index is None or self._co_version != version - 1:
+                return
+            for application_id, job_id, other_job_ids in applications:
+                if application_id <= self._co_last_id:
+                    continue
+                self._co_index.add(job_id, other_job_ids)
+                self._co_last_id = application_id
+            self._co_version = version
+
+    def _refit_due(self):
+        return self._recommender is not None and self._recommender.needs_refit
+
+    def _options(self):
+        config = current_app.config
+        self.profile_cache.max_size = config.get('RECOMMENDER_PROFILE_CACHE_SIZE', 10000)
+        return dict(
+            profile_cache=self.profile_cache,
+            refit_threshold=config.get('RECOMMENDER_REFIT_THRESHOLD', 0.2),
+            text_cache=ProcessedTextStore(),
+            inverted_index_min_jobs=config.get('RECOMMENDER_INVERTED_INDEX_MIN_JOBS'),
+            content_weight=config.get('RECOMMENDER_CONTENT_WEIGHT', 1.0),
+            co_application_weight=config.get('RECOMMENDER_CO_APPLICATION_WEIGHT', 0.0)
+        )
+    
+    def _load_or_fit(self, version):
+        """Memory-map the model saved for this corpus version, or fit and save it"""
+        from app.recommender import JobRecommender
+        
+        # Fails fast (LookupError) on hosts without the NLTK corpora unless downloads are enabled
+        ensure_nltk_resources(download=current_app.config.get('NLTK_AUTO_DOWNLOAD', False))
+        
+        model_dir = current_app.config.get('RECOMMENDER_MODEL_DIR')
+        path = model_dir and os.path.join(model_dir, f"{JOB_CORPUS}-v{version}-{self._variant()}")
+        
+        reuse_saved, self._reuse_saved = self._reuse_saved, True
+        if path and reuse_saved and os.path.isdir(path):
+            try:
+                return JobRecommender.load(path, **self._options())
+            except Exception as e:
+                print(f"Could not load saved recommender {path}, refitting: {e}")
+        
+        recommender = self._fit()
+        if path and recommender is not None:
+            try:
+                recommender.save(path)
+                prune_saved_models(model_dir, version)
+            except Exception as e:
+                print(f"Could not save recommender to {path}: {e}")
+        return recommender
+    
+    def _variant(self):
+        """Name of the configured model variant, so differently built models never mix"""
+        config = current_app.config
+        parts = [config.get('RECOMMENDER_ENGINE', 'tfidf')]
+        if config.get('RECOMMENDER_LSA_COMPONENTS'):
+            parts.append(f"lsa{config['RECOMMENDER_LSA_COMPONENTS']}")
+        parts.append(config.get('RECOMMENDER_INDEX_DTYPE', 'float32'))
+        if config.get('RECOMMENDER_MAX_TERMS_PER_JOB'):
+            parts.append(f"top{config['RECOMMENDER_MAX_TERMS_PER_JOB']}")
+        return '-'.join(parts)
+    
+    def _fit(self):
+        from app.recommender import JobRecommender
+        
+        config = current_app.config
+        batch_size = config.get('RECOMMENDER_LOAD_BATCH', JOB_LOAD_BATCH)
+        recommender = JobRecommender(
+            engine=config.get('RECOMMENDER_ENGINE', 'tfidf'),
+            hashing_features=config.get('RECOMMENDER_HASHING_FEATURES', 2 ** 18),
+            lsa_components=config.get('RECOMMENDER_LSA_COMPONENTS'),
+            index_dtype=config.get('RECOMMENDER_INDEX_DTYPE', 'float32'),
+            max_terms_per_job=config.get('RECOMMENDER_MAX_TERMS_PER_JOB'),
+            **self._options()
+        )
+        n_jobs = config.get('RECOMMENDER_FIT_JOBS', 1)
+        
+        if config.get('RECOMMENDER_STREAMING_FIT', False):
+            recommender.fit_stream(iter_active_job_chunks(batch_size), n_jobs=n_jobs)
+            if recommender.jobs is None:
+                return None
+            print(f"Fitted recommender on {len(recommender.jobs)} active jobs (streaming)")
+            return recommender
+        
+        active_jobs = load_active_jobs(batch_size)
+        if active_jobs.empty:
+            return None
+
+        print(f"Fitting recommender on {len(active_jobs)} active jobs")
+        return recommender.fit(active_jobs, n_jobs=n_jobs)
+
+def prune_saved_models(model_dir, version, keep=MODELS_KEPT):
+    """Delete saved models more than keep versions older than version
+    
+    Workers still mapping a deleted model keep reading it until they reload.
+    """
+    for name in os.listdir(model_dir):
+        match = re.fullmatch(rf"{JOB_CORPUS}-v(\d+)-[\w-]+", name)
+        if match and int(match.group(1)) <= version - keep:
+            shutil.rmtree(os.path.join(model_dir, name), ignore_errors=True)
+
+# Process-wide registry shared by all requests served by this worker
+registry = RecommenderRegistry()
+
+def get_recommender():
+    """Return this worker's fitted recommender, or None if there are no active jobs"""
+    return registry.get_recommender()
+
+def top_graduates_for_job(job_id, k=10, graduate_ids=None):
+    """Best-matching graduates for a posting as [{'graduate_id', 'similarity_score'}]
+    
+    graduate_ids restricts the ranking (e.g. to the applicants). Returns [] when
+    no recommender is available, so company pages never fail because of it.
+    """
+    try:
+        recommender, index = registry.get_graduate_index()
+        if recommender is None:
+            return []
+        return recommender.rank_graduates(index, job_id, k, graduate_ids)
+    except Exception as e:
+        print(f"Could not rank graduates for job {job_id}: {e}")
+        return []
+
+def applied_job_ids(graduate_ids):
+    """{graduate_id: [job ids they applied to]}"""
+    applied = {}
+    for chunk in _chunks(graduate_ids):
+        for graduate_id, job_id in db.session.execute(
+            select(Application.graduate_id, Application.job_id).where(Application.graduate_id.in_(chunk))
+        ):
+            applied.setdefault(graduate_id, []).append(job_id)
+    return applied
+
+def co_application_scorer(recommender):
+    """Function graduate_ids -> co-application scores over the recommender's job rows
+    
+    None when the recommender does not blend them in (zero weight).
+    """
+    if not recommender.co_application_weight:
+        return None
+    index = registry.get_co_application_index()
+    
+    def scores(graduate_ids):
+        applied = applied_job_ids(graduate_ids)
+        return index.scores([applied.get(graduate_id, []) for graduate_id in graduate_ids], recommender.job_ids)
+    return scores
+
+def graduate_co_scores(recommender, graduate):
+    """One graduate's co-application scores (one per job row), or None when not blended"""
+    scorer = co_application_scorer(recommender)
+    return None if scorer is None else scorer([graduate.id])[0]
+
+def graduate_job_filter(graduate):
+    """JobFilter of the hard constraints configured for a graduate's recommendations, or None"""
+    from app.recommender import JobFilter
+    
+    location = current_app.config.get('RECOMMENDER_FILTER_LOCATION')
+    salary = current_app.config.get('RECOMMENDER_FILTER_SALARY')
+    if not (location or salary):
+        return None
+    job_filter = JobFilter.for_graduate(graduate, location=location, salary=salary)
+    return None if job_filter.is_open else job_filter
+
+def _group_by_job_filter(graduates):
+    """[(job_filter, graduates)] sharing the same constraints, for batched scoring"""
+    groups = {}
+    for graduate in graduates:
+        job_filter = graduate_job_filter(graduate)
+        key = None if job_filter is None else job_filter.key()
+        groups.setdefault(key, (job_filter, []))[1].append(graduate)
+    return list(groups.values())
+
+def match_scores(graduate, job_ids):
+    """{job_id: similarity} for showing match badges on job listings
+    
+    Returns {} when the graduate has no profile to match or no recommender is
+    available, so listing pages never fail because of the recommender.
+    """
+    if graduate is None or not (graduate.skills or graduate.experience):
+        return {}
+    
+    try:
+        recommender = get_recommender()
+        if recommender is None:
+            return {}
+        return recommender.score_jobs(graduate, job_ids)
+    except Exception as e:
+        print(f"Could not score jobs for graduate {graduate.id}: {e}")
+        return {}
+
+def notify_jobs_changed(*jobs):
+    """Record that job postings changed; call before committing the change
+
+    The corpus version is bumped in the same transaction. Once it commits, the
+    given postings are patched into this worker's index; other workers see the
+    new version and refit on their next request.
+    """
+    db.session.flush()
+    version = bump_corpus_version(JOB_CORPUS)
+
+    # Snapshot the postings now: no SQL can be emitted from the after_commit hook
+    if jobs:
+        snapshots = [job.to_recommender_row() for job in jobs]
+        db.session.info.setdefault('recommender_job_changes', []).append((version, snapshots))
+
+def notify_profile_changed(graduate):
+    """Record that a graduate's profile changed; call before committing the change
+
+    Once it commits, the profile's cached vector is dropped and its row in this
+    worker's graduate index replaced; other workers rebuild their index.
+    """
+    version = bump_corpus_version(GRADUATE_CORPUS)
+    snapshot = SimpleNamespace(
+        id=graduate.id,
+        skills=graduate.skills,
+        experience=graduate.experience,
+        location_preference=graduate.location_preference
+    )
+    db.session.info.setdefault('recommender_profile_changes', []).append((version, [snapshot]))
+
+def applications_since(last_id):
+    """(application_id, job_id, job ids the graduate applied to before) of applications after last_id, in id order"""
+    new = db.session.execute(
+        select(Application.id, Application.graduate_id, Application.job_id)
+        .where(Application.id > last_id).order_by(Application.id)
+    ).all()
+    if not new:
+        return []
+    
+    # Every earlier application of the graduates involved, in one query
+    history = {}
+    for graduate_id, application_id, job_id in db.session.execute(
+        select(Application.graduate_id, Application.id, Application.job_id)
+        .where(Application.graduate_id.in_({graduate_id for _, graduate_id, _ in new}),
+               Application.id <= new[-1][0])
+        .order_by(Application.id)
+    ):
+        history.setdefault(graduate_id, []).append((application_id, job_id))
+    
+    return [
+        (application_id, job_id,
+         [other for other_id, other in history.get(graduate_id, []) if other_id < application_id and other != job_id])
+        for application_id, graduate_id, job_id in new
+    ]
+
+def notify_application(application):
+    """Record a new job application; call before committing it
+
+    Once it commits, the application is added to this worker's co-application
+    index; other workers read it on their next request.
+    """
+    # Insert only once the version row is locked, so application ids follow
+    # commit order and workers catching up by id never skip one
+    with db.session.no_autoflush:
+        version = bump_corpus_version(APPLICATION_CORPUS)
+    db.session.flush()
+    other_job_ids = db.session.execute(
+        select(Application.job_id).where(
+            Application.graduate_id == application.graduate_id, Application.job_id != application.job_id
+        )
+    ).scalars().all()
+    db.session.info.setdefault('recommender_applications', []).append(
+        (version, [(application.id, application.job_id, other_job_ids)])
+    )
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_committed_job_changes(session):
+    for version, snapshots in session.info.pop('recommender_job_changes', []):
+        registry.apply_job_changes(version, snapshots)
+    for version, snapshots in session.info.pop('recommender_profile_changes', []):
+        registry.apply_profile_changes(version, snapshots)
+    for version, applications in session.info.pop('recommender_applications', []):
+        registry.apply_applications(version, applications)
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_job_changes(session, previous_transaction):
+    session.info.pop('recommender_job_changes', None)
+    session.info.pop('recommender_profile_changes', None)
+    session.info.pop('recommender_applications', None)
+
+def join_terms(terms):
+    """Comma-separated matching terms, best first, keeping whole terms that fit the column (None without any)"""
+    limit = Recommendation.matching_terms.type.length
+    text = ''
+    for term in terms:
+        joined = f"{text}, {term}" if text else term
+        if len(joined) > limit:
+            break
+        text = joined
+    return text or None
+
+def recommendation_rows(graduate_id, recommendations):
+    """Recommendation table rows for one graduate's scored jobs"""
+    rows = []
+    for rec in recommendations:
+        # Ensure match score is reasonable (between 0 and 1)
+        match_score = max(0.0, min(1.0, rec['similarity_score']))
+        
+        # Only save recommendations with a meaningful score
+        if match_score > 0.01:  # At least 1% match
+            rows.append({
+                'graduate_id': graduate_id,
+                'job_id': int(rec['job_id']),
+                'match_score': match_score,
+                'matching_terms': join_terms(rec.get('matching_terms') or []),
+                'created_at': datetime.utcnow()
+            })
+    return rows
+
+def save_recommendations(results):
+    """Replace stored recommendations for {graduate_id: recommendations} in bulk
+
+    Runs in the current session; the caller commits.
+    """
+    graduate_ids = list(results)
+    for start in range(0, len(graduate_ids), ProcessedTextStore.chunk_size):
+        chunk = graduate_ids[start:start + ProcessedTextStore.chunk_size]
+        db.session.execute(delete(Recommendation).where(Recommendation.graduate_id.in_(chunk)))
+    
+    rows = [row for graduate_id, recs in results.items() for row in recommendation_rows(graduate_id, recs)]
+    if rows:
+        db.session.execute(insert(Recommendation), rows)
+    return len(rows)
+
+def refresh_all_recommendations(top_n=10, batch_size=2000, chunk_size=None):
+    """Recompute and store recommendations for every graduate with a usable profile
+
+    Graduates are loaded and scored batch_size at a time; each batch is one
+    recommend_batch() call and one bulk write, committed before the next.
+    Graduates without skills or experience (NULL or '') get their stored
+    recommendations deleted. Returns (graduates refreshed, recommendations
+    written, graduates cleared).
+    """
+    recommender = get_recommender()
+    if recommender is None:
+        print("No active job postings found")
+        return 0, 0, 0
+    
+    co_scores = co_application_scorer(recommender)
+    explain_terms = current_app.config.get('RECOMMENDER_EXPLAIN_TERMS', 5)
+    query = Graduate.query.order_by(Graduate.id)
+    
+    refreshed = written = cleared = 0
+    last_id = 0
+    while True:
+        graduates = query.filter(Graduate.id > last_id).limit(batch_size).all()
+        if not graduates:
+            break
+        last_id = graduates[-1].id
+        
+        # Keep the per-user rule: only graduates with skills or experience get
+        # recommendations; the rest keep none (an empty list replaces stale rows)
+        usable = [graduate for graduate in graduates if graduate.skills or graduate.experience]
+        results = {graduate.id: [] for graduate in graduates if not (graduate.skills or graduate.experience)}
+        cleared += len(results)
+        for job_filter, group in _group_by_job_filter(usable):
+            results.update(recommender.recommend_batch(
+                group, top_n=top_n, chunk_size=chunk_size, job_filter=job_filter, co_scores=co_scores,
+                explain_terms=explain_terms
+            ))
+        written += save_recommendations(results)
+        refreshed += len(usable)
+        db.session.commit()
+        print(f"Refreshed recommendations for {refreshed} graduates, cleared {cleared}")
+    
+    return refreshed, written, cleared
+
+def _chunks(ids, size=ProcessedTextStore.chunk_size):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+def _write_job_neighbors(recommender, job_ids, k, batch_size):
+    """Replace the stored neighbors of job_ids (None = every job) in the current session"""
+    if job_ids is None:
+        db.session.execute(delete(JobNeighbor))
+    else:
+        for chunk in _chunks(job_ids):
+            db.session.execute(delete(JobNeighbor).where(JobNeighbor.job_id.in_(chunk)))
+
+    written, rows = 0, []
+    for job_id, neighbor_ids, scores in recommender.similar_jobs(k, job_ids=job_ids):
+        rows.extend(
+            {'job_id': int(job_id), 'rank': rank, 'neighbor_id': int(neighbor_id), 'score': float(score)}
+            for rank, (neighbor_id, score) in enumerate(zip(neighbor_ids, scores))
+        )
+        if len(rows) >= batch_size:
+            db.session.execute(insert(JobNeighbor), rows)
+            written, rows = written + len(rows), []
+    if rows:
+        db.session.execute(insert(JobNeighbor), rows)
+    return written + len(rows)
+
+def _jobs_affected_by(recommender, job_ids, k):
+    """Jobs whose stored neighbor list can change when the given jobs change
+
+    That is the jobs themselves, jobs listing one of them as a neighbor, and
+    jobs now more similar to one of them than their current k-th neighbor.
+    """
+    affected = set(job_ids)
+    for chunk in _chunks(job_ids):
+        affected.update(db.session.execute(
+            select(JobNeighbor.job_id).where(JobNeighbor.neighbor_id.in_(chunk))
+        ).scalars())
+
+    similarities = recommender.job_similarities(job_ids).max(axis=1)
+    matching = similarities > 0
+    best = dict(zip(recommender.job_ids[matching].tolist(), similarities[matching].tolist()))
+
+    # Lists shorter than k take any match; unlisted jobs have none yet
+    thresholds = {}
+    for chunk in _chunks(set(best) - affected):
+        thresholds.update(
+            (job_id, score if count >= k else 0.0)
+            for job_id, count, score in db.session.execute(
+                select(JobNeighbor.job_id, func.count(), func.min(JobNeighbor.score))
+                .where(JobNeighbor.job_id.in_(chunk))
+                .group_by(JobNeighbor.job_id)
+            )
+        )
+    affected.update(job_id for job_id, score in best.items() if score > thresholds.get(job_id, 0.0))
+    return affected
+
+def refresh_job_neighbors(job_ids=None, k=JOB_NEIGHBORS, batch_size=10000):
+    """Recompute the stored similar jobs of every posting, or only where job_ids changed
+
+    Call after the change committed, so the recommender already reflects it.
+    A full rebuild (scripts/build_job_neighbors.py) replaces the whole table in
+    one transaction. An incremental refresh runs inside the editing request, so
+    it never fits a model: it is skipped when this worker has no current model
+    or the change touches more than JOB_NEIGHBORS_MAX_AFFECTED lists, and the
+    next full rebuild catches up. Returns the number of rows written; failures
+    are logged and leave the table as it was.
+    """
+    try:
+        if job_ids is None:
+            recommender = get_recommender()
+            if recommender is None:
+                db.session.execute(delete(JobNeighbor))
+                db.session.commit()
+                return 0
+        else:
+            recommender = registry.current_recommender()
+            if recommender is None:
+                print("Similar jobs not refreshed: no current recommender in this worker")
+                return 0
+            job_ids = sorted(_jobs_affected_by(recommender, list(job_ids), k))
+            if len(job_ids) > JOB_NEIGHBORS_MAX_AFFECTED:
+                print(f"Similar jobs not refreshed: {len(job_ids)} lists affected, left to the next full rebuild")
+                return 0
+
+        written = _write_job_neighbors(recommender, job_ids, k, batch_size)
+        db.session.commit()
+        return written
+    except Exception as e:
+        db.session.rollback()
+        print(f"Could not refresh similar jobs: {e}")
+        return 0
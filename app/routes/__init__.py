@@ -1,7 +1,9 @@
 # Main routes
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import current_user
-from app.models import JobPosting, Company
+from sqlalchemy.orm import joinedload
+from app.models import JobPosting, JobNeighbor, Company, Graduate
+from app.recommender_service import match_scores
 from app import db
 
 main_bp = Blueprint('main', __name__)
@@ -20,6 +22,12 @@ def index():
                           recent_jobs=recent_jobs, 
                           top_companies=top_companies)
 
+def graduate_match_scores(jobs):
+    """Match scores of the logged-in graduate for the listed jobs ({} for other visitors)"""
+    if not current_user.is_authenticated or current_user.user_type != 'graduate':
+        return {}
+    return match_scores(Graduate.query.get(current_user.id), [job.id for job in jobs])
+
 @main_bp.route('/about')
 def about():
     """About page"""
@@ -42,6 +50,8 @@ def jobs():
     category = request.args.get('category')
     location = request.args.get('location')
     job_type = request.args.get('type')
+    salary_min = request.args.get('salary_min', type=int)
+    salary_max = request.args.get('salary_max', type=int)
     
     # Apply filters if provided
     if category:
@@ -51,6 +61,12 @@ def jobs():
     if job_type:
         query = query.filter_by(job_type=job_type)
     
+    # Jobs whose parsed range overlaps the wanted one (a range scan on ix_job_postings_salary_range)
+    if salary_min is not None:
+        query = query.filter(JobPosting.salary_max >= salary_min)
+    if salary_max is not None:
+        query = query.filter(JobPosting.salary_min <= salary_max)
+    
     # Order by posting date (newest first)
     query = query.order_by(JobPosting.posting_date.desc())
     
@@ -95,7 +111,8 @@ def jobs():
                           jobs=jobs,
                           categories=categories,
                           locations=locations,
-                          job_types=job_types)
+                          job_types=job_types,
+                          match_scores=graduate_match_scores(jobs.items))
 
 @main_bp.route('/job/<int:job_id>')
 def job_detail(job_id):
@@ -107,11 +124,18 @@ def job_detail(job_id):
         flash('This job posting is no longer active.', 'info')
         return redirect(url_for('main.jobs'))
     
-    # Get similar jobs
-    similar_jobs = JobPosting.query.filter_by(
-        category=job.category, 
-        is_active=True
-    ).filter(JobPosting.id != job_id).limit(3).all()
+    # Get similar jobs: one primary-key range scan of the precomputed neighbors
+    similar_jobs = JobPosting.query.join(JobNeighbor, JobNeighbor.neighbor_id == JobPosting.id) \
+                   .options(joinedload(JobPosting.company)) \
+                   .filter(JobNeighbor.job_id == job_id, JobPosting.is_active.is_(True)) \
+                   .order_by(JobNeighbor.rank).limit(3).all()
+    
+    # Postings without neighbors yet (new, or no shared terms) fall back to the category
+    if not similar_jobs:
+        similar_jobs = JobPosting.query.filter_by(
+            category=job.category, 
+            is_active=True
+        ).filter(JobPosting.id != job_id).limit(3).all()
     
     return render_template('job_detail.html', job=job, similar_jobs=similar_jobs)
 
@@ -131,7 +155,8 @@ def search():
         JobPosting.is_active
     ).all()
     
-    return render_template('search_results.html', jobs=jobs, query=query)
+    return render_template('search_results.html', jobs=jobs, query=query,
+                          match_scores=graduate_match_scores(jobs))
 
 @main_bp.app_errorhandler(404)
 def page_not_found(e):
@@ -2,8 +2,7 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
 from app.models import db, Admin, Graduate, Company, JobPosting, Application, SUSEvaluation, Recommendation, User
-import pandas as pd
-import matplotlib.pyplot as plt
+from app.recommender_service import notify_jobs_changed, refresh_job_neighbors
 import io
 import base64
 from datetime import datetime, timedelta
@@ -122,7 +121,9 @@ def toggle_job(job_id):
     
     # Toggle active status
     job.is_active = not job.is_active
+    notify_jobs_changed(job)
     db.session.commit()
+    refresh_job_neighbors([job.id])
     
     if job.is_active:
         flash('Job posting activated successfully', 'success')
@@ -289,6 +290,8 @@ def create_admin():
 
 def generate_sus_chart():
     """Generate chart for SUS evaluations"""
+    import matplotlib.pyplot as plt
+    
     evaluations = SUSEvaluation.query.all()
     
     if not evaluations:
@@ -322,6 +325,9 @@ def generate_sus_chart():
 
 def generate_application_chart():
     """Generate chart for applications over time"""
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    
     # Get application data
     applications = Application.query.all()
     
@@ -4,7 +4,9 @@ from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
 import os
 from datetime import datetime
-from app.models import db, Company, JobPosting, Application
+from app.models import db, Company, Graduate, JobPosting, Application
+from app.salary import salary_columns
+from app.recommender_service import notify_jobs_changed, refresh_job_neighbors, top_graduates_for_job
 
 company_bp = Blueprint('company', __name__)
 
@@ -107,11 +109,15 @@ def create_job():
             category=request.form.get('category'),
             subcategory=request.form.get('subcategory'),
             role=request.form.get('role'),
-            salary=request.form.get('salary'),
             job_type=request.form.get('job_type'),
             qualification=request.form.get('qualification'),
             criteria=request.form.get('criteria'),
-            is_active=True
+            is_active=True,
+            **salary_columns(
+                request.form.get('salary'),
+                request.form.get('salary_min', type=int),
+                request.form.get('salary_max', type=int)
+            )
         )
         
         # Parse and set closing date if provided
@@ -120,7 +126,9 @@ def create_job():
             new_job.closing_date = datetime.strptime(closing_date, '%Y-%m-%d')
         
         db.session.add(new_job)
+        notify_jobs_changed(new_job)
         db.session.commit()
+        refresh_job_neighbors([new_job.id])
         
         flash('Job posting created successfully', 'success')
         return redirect(url_for('company.jobs'))
@@ -169,7 +177,12 @@ def edit_job(job_id):
         job.category = request.form.get('category')
         job.subcategory = request.form.get('subcategory')
         job.role = request.form.get('role')
-        job.salary = request.form.get('salary')
+        salary = salary_columns(
+            request.form.get('salary'),
+            request.form.get('salary_min', type=int),
+            request.form.get('salary_max', type=int)
+        )
+        job.salary, job.salary_min, job.salary_max = salary['salary'], salary['salary_min'], salary['salary_max']
         job.job_type = request.form.get('job_type')
         job.qualification = request.form.get('qualification')
         job.criteria = request.form.get('criteria')
@@ -179,7 +192,9 @@ def edit_job(job_id):
         if closing_date:
             job.closing_date = datetime.strptime(closing_date, '%Y-%m-%d')
         
+        notify_jobs_changed(job)
         db.session.commit()
+        refresh_job_neighbors([job.id])
         
         flash('Job posting updated successfully', 'success')
         return redirect(url_for('company.jobs'))
@@ -200,7 +215,9 @@ def toggle_job(job_id):
     
     # Toggle active status
     job.is_active = not job.is_active
+    notify_jobs_changed(job)
     db.session.commit()
+    refresh_job_neighbors([job.id])
     
     if job.is_active:
         flash('Job posting activated successfully', 'success')
@@ -209,6 +226,43 @@ def toggle_job(job_id):
     
     return redirect(url_for('company.jobs'))
 
+@company_bp.route('/job/<int:job_id>/candidates')
+@company_required
+def candidates(job_id):
+    """Graduates and applicants ranked by how well their profile matches a job posting"""
+    company = Company.query.get(current_user.id)
+    job = JobPosting.query.get_or_404(job_id)
+    
+    # Ensure the job belongs to this company
+    if job.company_id != company.id:
+        flash('You do not have permission to view candidates for this job posting.', 'danger')
+        return redirect(url_for('company.jobs'))
+    
+    applications = Application.query.filter_by(job_id=job.id).all()
+    applications_by_graduate = {application.graduate_id: application for application in applications}
+    
+    # Best matches among all graduates, and every applicant ranked by match
+    top_matches = top_graduates_for_job(job.id, k=20)
+    applicant_matches = top_graduates_for_job(job.id, k=len(applications), graduate_ids=list(applications_by_graduate))
+    
+    graduate_ids = {match['graduate_id'] for match in top_matches} | set(applications_by_graduate)
+    graduates = {graduate.id: graduate for graduate in Graduate.query.filter(Graduate.id.in_(graduate_ids)).all()}
+    
+    # Applicants without a matching profile are listed last with no score
+    applicant_scores = {match['graduate_id']: match['similarity_score'] for match in applicant_matches}
+    ranked_applications = sorted(
+        applications, key=lambda application: -applicant_scores.get(application.graduate_id, -1)
+    )
+    
+    return render_template('company/candidates.html',
+                          job=job,
+                          top_matches=[(graduates[match['graduate_id']], match['similarity_score'])
+                                       for match in top_matches if match['graduate_id'] in graduates],
+                          applications=[(application, graduates.get(application.graduate_id),
+                                         applicant_scores.get(application.graduate_id))
+                                        for application in ranked_applications],
+                          applications_by_graduate=applications_by_graduate)
+
 @company_bp.route('/change-password', methods=['POST'])
 @company_required
 def change_password():
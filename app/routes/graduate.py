@@ -5,7 +5,8 @@ from werkzeug.utils import secure_filename
 import os
 from datetime import datetime
 from app.models import db, Graduate, JobPosting, Application, Recommendation, SUSEvaluation
-from app.recommender import JobRecommender
+from app.recommender_service import (get_recommender, graduate_co_scores, graduate_job_filter, notify_application,
+                                     notify_profile_changed, save_recommendations)
 from app import bcrypt  # Add this import
 
 graduate_bp = Blueprint('graduate', __name__)
@@ -116,6 +117,7 @@ def profile():
                     flash('Invalid file type. Please upload a PDF or Word document.', 'danger')
         
         # Save changes
+        notify_profile_changed(graduate)
         db.session.commit()
         
         # Regenerate recommendations after profile update
@@ -194,6 +196,7 @@ def apply_job(job_id):
         
         try:
             db.session.add(application)
+            notify_application(application)
             db.session.commit()
             flash('Application submitted successfully!', 'success')
             return redirect(url_for('graduate.applications'))
@@ -318,41 +321,24 @@ def generate_recommendations(graduate_id):
             print(f"Graduate {graduate_id} has insufficient profile information")
             return []
         
-        # Get active job postings
-        active_jobs = JobPosting.query.filter_by(is_active=True).all()
+        # Get the worker's fitted recommender (refitted only when jobs change)
+        recommender = get_recommender()
         
-        if not active_jobs:
+        if recommender is None:
             print("No active job postings found")
             return []
         
-        print(f"Found {len(active_jobs)} active jobs for matching")
-        
-        # Initialize recommender
-        recommender = JobRecommender()
-        recommender.fit(active_jobs)
-        
         # Get recommendations
-        recommendations = recommender.get_recommendations_for_graduate(graduate, top_n=10)
+        recommendations = recommender.get_recommendations_for_graduate(
+            graduate, top_n=10, job_filter=graduate_job_filter(graduate),
+            co_scores=graduate_co_scores(recommender, graduate),
+            explain_terms=current_app.config.get('RECOMMENDER_EXPLAIN_TERMS', 5)
+        )
         
         print(f"Generated {len(recommendations)} recommendations")
         
-        # Clear existing recommendations
-        Recommendation.query.filter_by(graduate_id=graduate.id).delete()
-        
-        # Create new recommendation records
-        for rec in recommendations:
-            # Ensure match score is reasonable (between 0 and 1)
-            match_score = max(0.0, min(1.0, rec['similarity_score']))
-            
-            # Only save recommendations with a meaningful score
-            if match_score > 0.01:  # At least 1% match
-                recommendation = Recommendation(
-                    graduate_id=graduate.id,
-                    job_id=rec['job_id'],
-                    match_score=match_score
-                )
-                db.session.add(recommendation)
-        
+        # Replace existing recommendation records
+        save_recommendations({graduate.id: recommendations})
         db.session.commit()
         print(f"Saved recommendations for graduate {graduate_id}")
         
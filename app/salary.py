@@ -0,0 +1,98 @@
+# Salary string parsing for job postings
+import re
+
+# One figure ("4,000", "4000.50", "4k"), optionally after a currency and
+# followed by a second after a dash or "to" ("RM 4,000 - RM 6,500", "3k-5k",
+# "3,000 to 4,500")
+SALARY_PATTERN = re.compile(
+    r'(?:(?P<currency>rm|myr)\s*)?(?P<low>\d[\d,]*(?:\.\d+)?)\s*(?:(?P<low_k>k)(?![a-z]))?'
+    r'(?:\s*(?:-|–|—|to)\s*(?:rm|myr)?\s*(?P<high>\d[\d,]*(?:\.\d+)?)\s*(?:(?P<high_k>k)(?![a-z]))?)?',
+    re.IGNORECASE
+)
+
+# Figures below this are not monthly salaries ("2 years exp", "5 days a week")
+MIN_SALARY = 100
+
+def _amounts(numbers, thousands):
+    """Numeric amounts of extracted figures, times 1000 where a k suffix followed"""
+    import pandas as pd
+
+    amounts = pd.to_numeric(numbers.str.replace(',', '', regex=False), errors='coerce')
+    return amounts * thousands.notna().map({True: 1000, False: 1})
+
+def parse_salaries(values):
+    """Parse free-text salaries into a DataFrame of salary_min/salary_max (nullable Int64)
+
+    Works on the whole column at once with pandas string operations. Of the
+    figures in a text, the first one with a currency (RM/MYR) wins, else the
+    first one; figures under MIN_SALARY are ignored. A single figure gives equal
+    bounds, reversed ranges are swapped and text without a salary figure
+    ("Negotiable", None) gives missing bounds.
+    """
+    import numpy as np
+    import pandas as pd
+
+    values = pd.Series(list(values), dtype='string')
+    parts = values.str.extractall(SALARY_PATTERN)
+    low = _amounts(parts['low'], parts['low_k'])
+    high = _amounts(parts['high'], parts['high_k'])
+
+    # "3-5k": the suffix on the upper figure applies to a bare lower figure too
+    shared_k = parts['low_k'].isna() & parts['high_k'].notna() & (low < 1000) & (low * 1000 <= high)
+    low = low.where(~shared_k.fillna(False), low * 1000)
+    high = high.fillna(low)
+
+    # One match per text: plausible figures only, those with a currency first
+    matches = pd.DataFrame({
+        'low': np.fmin(low, high), 'high': np.fmax(low, high), 'plain': parts['currency'].isna()
+    })
+    matches = matches[matches['low'] >= MIN_SALARY]
+    best = matches.sort_values('plain', kind='stable').groupby(level=0).head(1).droplevel(1)
+    best = best.reindex(range(len(values)))
+    return pd.DataFrame({
+        'salary_min': best['low'].round().astype('Int64'),
+        'salary_max': best['high'].round().astype('Int64'),
+    })
+
+def parse_salary(text):
+    """(salary_min, salary_max) of one salary string, (None, None) without a figure
+
+    >>> parse_salary('RM 4,000 - RM 6,500')
+    (4000, 6500)
+    >>> parse_salary('3-5k')
+    (3000, 5000)
+    >>> parse_salary('2 years exp, RM 3000')
+    (3000, 3000)
+    >>> parse_salary('Negotiable')
+    (None, None)
+    """
+    import pandas as pd
+
+    row = parse_salaries([text]).iloc[0]
+    return tuple(None if pd.isna(value) else int(value) for value in row)
+
+def format_salary(salary_min, salary_max):
+    """Display text for numeric bounds, e.g. 'RM 3,000 - RM 5,000' (None without bounds)"""
+    bounds = [bound for bound in (salary_min, salary_max) if bound is not None]
+    if not bounds:
+        return None
+    low, high = min(bounds), max(bounds)
+    if low == high:
+        return f"RM {low:,}"
+    return f"RM {low:,} - RM {high:,}"
+
+def salary_columns(text=None, salary_min=None, salary_max=None):
+    """salary, salary_min and salary_max for a posting, from the form's text and/or numbers
+
+    Numeric inputs win over the text, which is parsed when they are missing and
+    generated from them when it is.
+    """
+    text = (text or '').strip() or None
+    if salary_min is None and salary_max is None:
+        salary_min, salary_max = parse_salary(text)
+    else:
+        salary_min = salary_max if salary_min is None else salary_min
+        salary_max = salary_min if salary_max is None else salary_max
+        salary_min, salary_max = min(salary_min, salary_max), max(salary_min, salary_max)
+        text = text or format_salary(salary_min, salary_max)
+    return {'salary': text, 'salary_min': salary_min, 'salary_max': salary_max}
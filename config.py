@@ -123,6 +123,69 @@ class Config:
     TFIDF_MIN_DF = 1
     TFIDF_MAX_DF = 0.85
     
+    # Incremental index updates: fraction of changed postings after which the
+    # per-worker model is fully refitted instead of patched in place
+    RECOMMENDER_REFIT_THRESHOLD = float(os.environ.get('RECOMMENDER_REFIT_THRESHOLD') or 0.2)
+    
+    # Corpus size from which single queries use the inverted index (unset = never)
+    _inverted_index_min_jobs = os.environ.get('RECOMMENDER_INVERTED_INDEX_MIN_JOBS')
+    RECOMMENDER_INVERTED_INDEX_MIN_JOBS = int(_inverted_index_min_jobs) if _inverted_index_min_jobs else None
+    
+    # Rows fetched per round trip when loading the job corpus for a fit
+    RECOMMENDER_LOAD_BATCH = int(os.environ.get('RECOMMENDER_LOAD_BATCH') or 5000)
+    
+    # Fit in two passes over a server-side cursor, spooling processed text to a
+    # temporary file, so memory stays bounded on very large corpora
+    RECOMMENDER_STREAMING_FIT = os.environ.get('RECOMMENDER_STREAMING_FIT', 'false').lower() in ['true', 'on', '1']
+    
+    # Worker processes preprocessing job text during a full fit (1 = serial, -1 = all cores)
+    RECOMMENDER_FIT_JOBS = int(os.environ.get('RECOMMENDER_FIT_JOBS') or 1)
+    
+    # Vectorizer engine: 'tfidf' (fitted vocabularies) or 'hashing' (no vocabulary
+    # held in memory) and the hashed columns per field
+    RECOMMENDER_ENGINE = os.environ.get('RECOMMENDER_ENGINE') or 'tfidf'
+    RECOMMENDER_HASHING_FEATURES = int(os.environ.get('RECOMMENDER_HASHING_FEATURES') or 2 ** 18)
+    
+    # LSA mode: score jobs by dense truncated-SVD embeddings of this many
+    # dimensions (128-256) instead of sparse TF-IDF rows (unset = off)
+    _lsa_components = os.environ.get('RECOMMENDER_LSA_COMPONENTS')
+    RECOMMENDER_LSA_COMPONENTS = int(_lsa_components) if _lsa_components else None
+    
+    # Index compaction: storage type of the job rows ('float64', 'float32' or
+    # 'uint8' with per-row scales) and the heaviest terms kept per job (unset = all)
+    RECOMMENDER_INDEX_DTYPE = os.environ.get('RECOMMENDER_INDEX_DTYPE') or 'float32'
+    _max_terms_per_job = os.environ.get('RECOMMENDER_MAX_TERMS_PER_JOB')
+    RECOMMENDER_MAX_TERMS_PER_JOB = int(_max_terms_per_job) if _max_terms_per_job else None
+    
+    # Fitted models are saved here per corpus version and memory-mapped by every
+    # worker, so a host holds one copy (empty = fit in every worker, save nothing)
+    RECOMMENDER_MODEL_DIR = os.environ.get('RECOMMENDER_MODEL_DIR', os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'instance', 'recommender'
+    ))
+    
+    # Treat a graduate's location preference as a hard constraint: only postings
+    # in that location are scored for their recommendations
+    RECOMMENDER_FILTER_LOCATION = os.environ.get('RECOMMENDER_FILTER_LOCATION', 'false').lower() in ['true', 'on', '1']
+    
+    # Likewise for salary: only postings whose parsed range reaches the lower
+    # figure of the graduate's salary preference are scored
+    RECOMMENDER_FILTER_SALARY = os.environ.get('RECOMMENDER_FILTER_SALARY', 'false').lower() in ['true', 'on', '1']
+    
+    # Blend of the content (TF-IDF cosine) score and the co-application score
+    # (graduates who applied to the same jobs) for graduates with applications
+    # (defaults = content only; e.g. 0.8/0.2 turns the blend on)
+    RECOMMENDER_CONTENT_WEIGHT = float(os.environ.get('RECOMMENDER_CONTENT_WEIGHT') or 1.0)
+    RECOMMENDER_CO_APPLICATION_WEIGHT = float(os.environ.get('RECOMMENDER_CO_APPLICATION_WEIGHT') or 0.0)
+    
+    # Terms each stored recommendation lists as the reason it matched (0 = none)
+    RECOMMENDER_EXPLAIN_TERMS = int(os.environ.get('RECOMMENDER_EXPLAIN_TERMS') or 5)
+    
+    # Transformed graduate profile vectors kept per worker (LRU)
+    RECOMMENDER_PROFILE_CACHE_SIZE = int(os.environ.get('RECOMMENDER_PROFILE_CACHE_SIZE') or 10000)
+    
+    # Download missing NLTK corpora on first use (off: offline hosts fail fast instead)
+    NLTK_AUTO_DOWNLOAD = os.environ.get('NLTK_AUTO_DOWNLOAD', '').lower() in ('1', 'true', 'yes')
+    
     # =================================================================
     # SECURITY SETTINGS
     # =================================================================
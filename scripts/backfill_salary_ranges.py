@@ -0,0 +1,74 @@
+"""
+Salary range backfill
+Run this script to parse the free-text salary of existing job postings into
+the numeric salary_min/salary_max columns, a chunk of postings at a time
+(e.g. `python scripts/backfill_salary_ranges.py --batch-size 5000`)
+"""
+import os
+import sys
+import argparse
+import time
+
+# Add the parent directory to the path so we can import our app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, update
+from app import create_app, db
+from app.models import JobPosting
+from app.recommender_service import JOB_CORPUS, bump_corpus_version
+from app.salary import parse_salaries
+from config import Config
+
+def backfill(batch_size=5000, overwrite=False):
+    """Parse salaries batch_size postings at a time, committing each batch
+
+    Only postings with salary text and no numeric bounds are touched unless
+    overwrite is set. Returns (postings scanned, postings given a range).
+    """
+    query = select(JobPosting.id, JobPosting.salary).where(JobPosting.salary.isnot(None)).order_by(JobPosting.id)
+    if not overwrite:
+        query = query.where(JobPosting.salary_min.is_(None), JobPosting.salary_max.is_(None))
+
+    scanned = parsed = 0
+    last_id = 0
+    while True:
+        rows = db.session.execute(query.where(JobPosting.id > last_id).limit(batch_size)).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        scanned += len(rows)
+
+        # One vectorized parse per batch, then one executemany of the parsed rows
+        bounds = parse_salaries(salary for _, salary in rows)
+        bounds['id'] = [job_id for job_id, _ in rows]
+        bounds = bounds[bounds['salary_min'].notna()]
+        if len(bounds):
+            db.session.execute(update(JobPosting), [
+                {'id': int(job_id), 'salary_min': int(low), 'salary_max': int(high)}
+                for job_id, low, high in bounds[['id', 'salary_min', 'salary_max']].itertuples(index=False)
+            ])
+            parsed += len(bounds)
+        db.session.commit()
+        print(f"Scanned {scanned} postings, parsed {parsed} salary ranges")
+
+    # Recommender models hold the salary bounds: have every worker refit
+    if parsed:
+        bump_corpus_version(JOB_CORPUS)
+        db.session.commit()
+    return scanned, parsed
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill numeric salary ranges from the salary text')
+    parser.add_argument('--batch-size', type=int, default=5000, help='postings parsed and written per transaction')
+    parser.add_argument('--overwrite', action='store_true', help='also re-parse postings that already have a range')
+    args = parser.parse_args()
+
+    app = create_app(Config)
+    with app.app_context():
+        started = time.perf_counter()
+        scanned, parsed = backfill(args.batch_size, args.overwrite)
+        elapsed = time.perf_counter() - started
+        print(f"Parsed {parsed} of {scanned} postings in {elapsed:.1f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,654 @@
+"""
+Recommender micro-benchmarks
+Run this script to time the recommendation engine on synthetic TF-IDF data,
+e.g. `python scripts/benchmark_recommender.py query --sizes 10000 100000 1000000`
+(run with --help to list the benchmarks)
+"""
+import os
+import sys
+import argparse
+import pickle
+import shutil
+import string
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+
+# Add the parent directory to the path so we can import our app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.recommender import (CoApplicationIndex, FieldWeightedVectorizer, GraduateIndex, HashingTfidfVectorizer, InvertedIndex, JobFilter,
+                           JobRecommender, JobStore, LatentSemanticIndex, TEXT_FIELDS, compact_rows, make_tfidf_vectorizer,
+                           top_k_indices)
+from app.text_processing import get_normalizer, normalize_rows_parallel
+
+def term_popularity(n_features):
+    """Zipf-like term popularity so some columns are much denser than others"""
+    popularity = 1.0 / np.arange(1, n_features + 1)
+    return popularity / popularity.sum()
+
+def random_term_rows(n_rows, n_features, terms_per_row, seed):
+    rng = np.random.default_rng(seed)
+    indices = rng.choice(n_features, size=n_rows * terms_per_row, p=term_popularity(n_features)).astype(np.int32)
+    data = rng.random(n_rows * terms_per_row)
+    indptr = np.arange(0, n_rows * terms_per_row + 1, terms_per_row, dtype=np.int64)
+    matrix = sp.csr_matrix((data, indices, indptr), shape=(n_rows, n_features))
+    matrix.sum_duplicates()
+    return matrix
+
+def synthetic_idf(n_jobs, n_features=10000, terms_per_job=100):
+    """Expected IDF of each synthetic term, so common terms carry little weight"""
+    expected_df = n_jobs * (1 - (1 - term_popularity(n_features)) ** terms_per_job)
+    return np.log((1 + n_jobs) / (1 + expected_df)) + 1
+
+def synthetic_job_matrix(n_jobs, n_features=10000, terms_per_job=100, seed=0):
+    """Random L2-normalized CSR matrix shaped like a fitted TF-IDF job matrix"""
+    matrix = random_term_rows(n_jobs, n_features, terms_per_job, seed)
+    idf = synthetic_idf(n_jobs, n_features, terms_per_job)
+    return normalize(matrix.multiply(idf).tocsr())
+
+def synthetic_profiles(n_profiles, n_jobs, n_features=10000, terms_per_job=100, terms_per_profile=30, seed=1):
+    """Random L2-normalized profile vectors weighted with the job corpus IDF"""
+    matrix = random_term_rows(n_profiles, n_features, terms_per_profile, seed)
+    idf = synthetic_idf(n_jobs, n_features, terms_per_job)
+    return normalize(matrix.multiply(idf).tocsr())
+
+def synthetic_recommender(n_jobs, n_features=10000, terms_per_job=100):
+    """JobRecommender holding a synthetic index (no text pipeline involved)"""
+    recommender = JobRecommender()
+    recommender.tfidf_matrix = synthetic_job_matrix(n_jobs, n_features, terms_per_job)
+    recommender.jobs = JobStore.from_frame(pd.DataFrame({'id': np.arange(1, n_jobs + 1)}))
+    return recommender
+
+SAMPLE_WORDS = (
+    'Senior Python developer building cloud services with Django, SQL and AWS. '
+    'Analyse data, build dashboards and present findings to stakeholders! '
+    'Registered nurses needed for clinical wards; diploma or degree in nursing. '
+    'Apply at https://careers.example.com or email hr@example.com before 2024. '
+    'Accountants managing budgets, audits, taxation & financial reporting (ACCA/CPA). '
+    "We're hiring marketing executives who can't wait to grow our brands' reach."
+).split()
+
+def synthetic_job_rows(n_jobs, words_per_job=120, seed=0):
+    """Random job field tuples in TEXT_FIELDS order, drawn from realistic words"""
+    rng = np.random.default_rng(seed)
+    lengths = {'title': 4, 'description': words_per_job, 'category': 2, 'role': 3, 'qualification': 8}
+    rows = []
+    for _ in range(n_jobs):
+        rows.append(tuple(
+            ' '.join(rng.choice(SAMPLE_WORDS, lengths[field])) + f" v{rng.integers(10000)}x"
+            for field in TEXT_FIELDS
+        ))
+    return rows
+
+def synthetic_word(index):
+    """Letters-only word for a term id (normalized text has no digits)"""
+    letters = ''
+    index += 26 * 27
+    while index:
+        index, letter = divmod(index, 26)
+        letters += string.ascii_lowercase[letter]
+    return letters
+
+def synthetic_field_texts(n_docs, n_terms=50000, seed=0):
+    """Already normalized {field: texts} with Zipf-distributed terms"""
+    rng = np.random.default_rng(seed)
+    lengths = {'title': 4, 'description': 120, 'category': 2, 'role': 3, 'qualification': 8}
+    popularity = term_popularity(n_terms)
+    words = np.array([synthetic_word(i) for i in range(n_terms)], dtype=object)
+    return {
+        field: [' '.join(words[rng.choice(n_terms, length, p=popularity)]) for _ in range(n_docs)]
+        for field, length in lengths.items()
+    }
+
+def percentiles(timings):
+    timings_ms = np.array(timings) * 1000
+    return np.percentile(timings_ms, 50), np.percentile(timings_ms, 99)
+
+def time_queries(func, profiles):
+    timings = []
+    for i in range(profiles.shape[0]):
+        started = time.perf_counter()
+        func(profiles[i])
+        timings.append(time.perf_counter() - started)
+    return percentiles(timings)
+
+def bench_query(args):
+    """p50/p99 latency of one graduate query, original path vs sparse top-k path"""
+    print(f"{'jobs':>10} {'path':<22} {'p50 ms':>9} {'p99 ms':>9}")
+    for n_jobs in args.sizes:
+        recommender = synthetic_recommender(n_jobs, args.features, args.terms)
+        profiles = synthetic_profiles(args.queries, n_jobs, args.features, args.terms)
+        job_ids = recommender.job_ids
+
+        def original(profile, top_n=args.top_n):
+            # cosine_similarity + full argsort + per-row id lookups, as before
+            similarities = cosine_similarity(profile, recommender.tfidf_matrix).flatten()
+            top_indices = similarities.argsort()[:-top_n - 1:-1]
+            return [(job_ids[idx], similarities[idx]) for idx in top_indices if similarities[idx] > 0]
+
+        def sparse_top_k(profile):
+            return recommender.recommend_for_vector(profile, args.top_n)
+
+        for name, func in [('cosine + argsort', original), ('csr matvec + top-k', sparse_top_k)]:
+            p50, p99 = time_queries(func, profiles)
+            print(f"{n_jobs:>10} {name:<22} {p50:>9.2f} {p99:>9.2f}")
+
+def bench_retrieval(args):
+    """p50/p99 latency of exhaustive scoring vs inverted-index max-score retrieval"""
+    print(f"{'jobs':>10} {'path':<22} {'p50 ms':>9} {'p99 ms':>9}")
+    for n_jobs in args.sizes:
+        matrix = synthetic_job_matrix(n_jobs, args.features, args.terms)
+        profiles = synthetic_profiles(args.queries, n_jobs, args.features, args.terms)
+        
+        started = time.perf_counter()
+        index = InvertedIndex(matrix)
+        print(f"{n_jobs:>10} {'index build':<22} {(time.perf_counter() - started) * 1000:>9.1f}")
+        
+        def exhaustive(profile):
+            scores = matrix @ profile.toarray().ravel()
+            top = top_k_indices(scores, args.top_n)
+            return top, scores[top]
+        
+        def pruned(profile):
+            return index.top_k(profile, args.top_n)
+        
+        # The pruned path must return exactly the same top-k scores
+        for i in range(profiles.shape[0]):
+            expected = exhaustive(profiles[i])[1]
+            actual = pruned(profiles[i])[1]
+            if not np.allclose(expected, actual):
+                raise AssertionError(f"inverted index top-k differs for query {i}")
+        
+        for name, func in [('exhaustive matvec', exhaustive), ('inverted max-score', pruned)]:
+            p50, p99 = time_queries(func, profiles)
+            print(f"{n_jobs:>10} {name:<22} {p50:>9.2f} {p99:>9.2f}")
+
+def bench_preprocess(args):
+    """Wall time of fit preprocessing on 1..N worker processes, checked against serial"""
+    rows = synthetic_job_rows(args.jobs)
+    expected = None
+    
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}")
+    for n_jobs in args.workers:
+        # Start every run with a cold lemma memo so workers do not inherit a warm one
+        get_normalizer()._lemmas.clear()
+        started = time.perf_counter()
+        processed = normalize_rows_parallel(rows, n_jobs)
+        elapsed = time.perf_counter() - started
+        
+        if expected is None:
+            expected, serial = processed, elapsed
+        elif processed != expected:
+            raise AssertionError(f"output with {n_jobs} workers differs from {args.workers[0]} workers")
+        print(f"{n_jobs:>8} {elapsed:>9.2f} {serial / elapsed:>7.2f}x")
+
+def unpruned_tfidf_vectorizer():
+    """The TF-IDF engine without max_features/max_df pruning, as a reference"""
+    return make_tfidf_vectorizer().set_params(max_features=None, max_df=1.0)
+
+def overlap(expected, actual, top_n):
+    return np.mean([len(np.intersect1d(e, a)) / top_n for e, a in zip(expected, actual)])
+
+def bench_engines(args):
+    """Top-k overlap and model size of the hashing engine against the TF-IDF engine
+
+    Overlap is also reported against TF-IDF without vocabulary pruning, which
+    separates hash collisions from the terms the TF-IDF engine drops.
+    """
+    jobs = synthetic_field_texts(args.jobs)
+    profiles = [
+        ' '.join(texts) for texts in zip(*synthetic_field_texts(args.queries, seed=1).values())
+    ]
+    
+    engines = {'tfidf': make_tfidf_vectorizer, 'tfidf unpruned': unpruned_tfidf_vectorizer}
+    engines.update({
+        f"hashing 2^{bits}": partial(HashingTfidfVectorizer, 2 ** bits) for bits in args.bits
+    })
+    
+    rankings = {}
+    results = []
+    for name, factory in engines.items():
+        vectorizer = FieldWeightedVectorizer(vectorizer_factory=factory)
+        started = time.perf_counter()
+        matrix = vectorizer.fit_transform(jobs)
+        fitted = time.perf_counter() - started
+        
+        scores = (vectorizer.transform_query(profiles) @ matrix.T).toarray()
+        rankings[name] = top_k_indices(scores, args.top_n)
+        results.append((name, fitted, len(pickle.dumps(vectorizer)) / 2 ** 20))
+    
+    print(f"{'engine':<14} {'fit s':>7} {'pickled MB':>11} {'overlap tfidf':>14} {'overlap unpruned':>17}")
+    for name, fitted, size in results:
+        print(f"{name:<14} {fitted:>7.2f} {size:>11.1f}"
+              f" {overlap(rankings['tfidf'], rankings[name], args.top_n):>14.3f}"
+              f" {overlap(rankings['tfidf unpruned'], rankings[name], args.top_n):>17.3f}")
+
+def fitted_synthetic_recommender(n_jobs, engine='tfidf'):
+    """JobRecommender fitted on synthetic normalized text (skips NLTK preprocessing)"""
+    recommender = JobRecommender(engine=engine)
+    recommender.vectorizer = FieldWeightedVectorizer(recommender.field_weights, recommender.vectorizer_factory())
+    recommender.tfidf_matrix = recommender.vectorizer.fit_transform(synthetic_field_texts(n_jobs))
+    recommender.jobs = JobStore.from_frame(pd.DataFrame({'id': np.arange(1, n_jobs + 1)}))
+    recommender.doc_freq = np.bincount(recommender.tfidf_matrix.indices, minlength=recommender.tfidf_matrix.shape[1])
+    recommender.n_docs = recommender.fitted_docs = n_jobs
+    return recommender
+
+def bench_lsa(args):
+    """SVD fit time, query latency, index size and top-k overlap of LSA mode vs sparse TF-IDF"""
+    print(f"{'jobs':>10} {'mode':<12} {'fit s':>7} {'p50 ms':>8} {'p99 ms':>8} {'index MB':>9} {'overlap':>8}")
+    for n_jobs in args.sizes:
+        recommender = fitted_synthetic_recommender(n_jobs)
+        matrix = recommender.tfidf_matrix
+        profiles = recommender.vectorizer.transform_query([
+            ' '.join(texts) for texts in zip(*synthetic_field_texts(args.queries, seed=1).values())
+        ])
+        
+        def ranking():
+            return [
+                [recommendation['job_id'] for recommendation in recommender.recommend_for_vector(profiles[i], args.top_n)]
+                for i in range(profiles.shape[0])
+            ]
+        
+        expected = ranking()
+        p50, p99 = time_queries(partial(recommender.recommend_for_vector, top_n=args.top_n), profiles)
+        matrix_mb = (matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes) / 2 ** 20
+        print(f"{n_jobs:>10} {'sparse':<12} {'':>7} {p50:>8.2f} {p99:>8.2f} {matrix_mb:>9.1f} {1:>8.3f}")
+        
+        for n_components in args.components:
+            started = time.perf_counter()
+            recommender.lsa = LatentSemanticIndex.fit(matrix, n_components)
+            fitted = time.perf_counter() - started
+            
+            p50, p99 = time_queries(partial(recommender.recommend_for_vector, top_n=args.top_n), profiles)
+            overlaps = [
+                len(set(want) & set(got)) / max(len(want), 1) for want, got in zip(expected, ranking())
+            ]
+            index_mb = (recommender.lsa.embeddings.nbytes + recommender.lsa.projection.nbytes) / 2 ** 20
+            print(f"{n_jobs:>10} {f'lsa {n_components}':<12} {fitted:>7.1f} {p50:>8.2f} {p99:>8.2f}"
+                  f" {index_mb:>9.1f} {np.mean(overlaps):>8.3f}")
+        recommender.lsa = None
+
+def bench_compact(args):
+    """Index size, query latency and top-k overlap of compacted job matrices vs float64"""
+    variants = [('float64', None), ('float32', None), ('uint8', None)]
+    variants += [(dtype, max_terms) for max_terms in args.max_terms for dtype in ('float32', 'uint8')]
+    
+    print(f"{'jobs':>10} {'index':<16} {'MB':>8} {'p50 ms':>8} {'p99 ms':>8} {'overlap':>8}")
+    for n_jobs in args.sizes:
+        recommender = fitted_synthetic_recommender(n_jobs)
+        full = recommender.tfidf_matrix
+        profiles = recommender.vectorizer.transform_query([
+            ' '.join(texts) for texts in zip(*synthetic_field_texts(args.queries, seed=1).values())
+        ])
+        
+        expected = None
+        for dtype, max_terms in variants:
+            recommender.index_dtype = dtype
+            recommender.tfidf_matrix, recommender.row_scales = compact_rows(full, dtype, max_terms)
+            matrix = recommender.tfidf_matrix
+            size = matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+            size += 0 if recommender.row_scales is None else recommender.row_scales.nbytes
+            
+            rankings = [
+                {recommendation['job_id'] for recommendation in recommender.recommend_for_vector(profiles[i], args.top_n)}
+                for i in range(profiles.shape[0])
+            ]
+            expected = expected or rankings
+            overlaps = [len(want & got) / max(len(want), 1) for want, got in zip(expected, rankings)]
+            
+            p50, p99 = time_queries(partial(recommender.recommend_for_vector, top_n=args.top_n), profiles)
+            name = dtype if max_terms is None else f"{dtype} top-{max_terms}"
+            print(f"{n_jobs:>10} {name:<16} {size / 2**20:>8.1f} {p50:>8.2f} {p99:>8.2f} {np.mean(overlaps):>8.3f}")
+
+def bench_candidates(args):
+    """p50/p99 latency of ranking every indexed graduate for one job posting"""
+    jobs = synthetic_job_matrix(args.queries, args.features, args.terms).astype(np.float32)
+    print(f"{'graduates':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for n_graduates in args.sizes:
+        profiles = synthetic_profiles(n_graduates, args.queries, args.features, args.terms)
+        index = GraduateIndex(None, profiles.astype(np.float32), range(1, n_graduates + 1))
+        p50, p99 = time_queries(partial(index.top_k, k=args.top_n), jobs)
+        print(f"{n_graduates:>10} {p50:>9.2f} {p99:>9.2f}")
+
+def bench_neighbors(args):
+    """Bulk build time of every job's top-k similar jobs, and the per-change similarity pass"""
+    print(f"{'jobs':>10} {'bulk s':>9} {'jobs/s':>9} {'one change ms':>14}")
+    for n_jobs in args.sizes:
+        recommender = synthetic_recommender(n_jobs, args.features, args.terms)
+        recommender.tfidf_matrix = recommender.tfidf_matrix.astype(np.float32)
+        
+        started = time.perf_counter()
+        for _ in recommender.similar_jobs(args.top_n):
+            pass
+        bulk = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        changed = recommender.job_ids[:1]
+        recommender.job_similarities(changed)
+        list(recommender.similar_jobs(args.top_n, job_ids=changed))
+        change_ms = (time.perf_counter() - started) * 1000
+        print(f"{n_jobs:>10} {bulk:>9.1f} {n_jobs / bulk:>9.0f} {change_ms:>14.1f}")
+
+def bench_filters(args):
+    """p50/p99 latency of unfiltered vs pre-filtered (location, salary) single queries"""
+    rng = np.random.default_rng(0)
+    filters = {
+        'none': None,
+        'location': JobFilter(locations=['Penang']),
+        'location+salary': JobFilter(locations=['Penang'], min_salary=6000),
+    }
+    
+    print(f"{'jobs':>10} {'filter':<16} {'eligible':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for n_jobs in args.sizes:
+        recommender = synthetic_recommender(n_jobs, args.features, args.terms)
+        recommender.tfidf_matrix = recommender.tfidf_matrix.astype(np.float32)
+        salary_min = rng.integers(20, 80, n_jobs) * 100
+        recommender.jobs = JobStore.from_frame(pd.DataFrame({
+            'id': recommender.job_ids,
+            'location': rng.choice(['Kuala Lumpur', 'Penang', 'Johor', 'Selangor', 'Sabah'], n_jobs,
+                                   p=[0.4, 0.1, 0.2, 0.2, 0.1]),
+            'salary_min': salary_min,
+            'salary_max': salary_min + rng.integers(5, 30, n_jobs) * 100,
+        }))
+        profiles = synthetic_profiles(args.queries, n_jobs, args.features, args.terms)
+        
+        for name, job_filter in filters.items():
+            eligible = n_jobs if job_filter is None else int(job_filter.mask(recommender.jobs).sum())
+            p50, p99 = time_queries(
+                partial(recommender.recommend_for_vector, top_n=args.top_n, job_filter=job_filter), profiles
+            )
+            print(f"{n_jobs:>10} {name:<16} {eligible:>9} {p50:>8.2f} {p99:>8.2f}")
+
+def bench_coapply(args):
+    """Co-application index build time, incremental adds and batch scoring for synthetic applications"""
+    rng = np.random.default_rng(0)
+    print(f"{'applications':>13} {'build s':>8} {'nnz':>12} {'add us':>8} {'score ms/1k':>12}")
+    for n_applications in args.sizes:
+        n_graduates = max(1, n_applications // args.per_graduate)
+        graduate_ids = rng.integers(1, n_graduates + 1, n_applications)
+        job_ids = rng.choice(np.arange(1, args.jobs + 1), size=n_applications, p=term_popularity(args.jobs))
+        
+        started = time.perf_counter()
+        index = CoApplicationIndex.build(graduate_ids, job_ids)
+        build = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        for job_id, others in zip(job_ids[:1000], np.split(job_ids[1000:6000], 1000)):
+            index.add(int(job_id), others.tolist())
+        add_us = (time.perf_counter() - started) * 1000
+        
+        applied = np.split(job_ids[:1000 * args.per_graduate], 1000)
+        started = time.perf_counter()
+        index.scores(applied, np.arange(1, args.jobs + 1))
+        score_ms = (time.perf_counter() - started) * 1000
+        print(f"{n_applications:>13} {build:>8.1f} {index.matrix.nnz:>12} {add_us:>8.1f} {score_ms:>12.1f}")
+
+def bench_artifacts(args):
+    """Save time, then load time and first-query latency of a saved model, mmap vs in-memory"""
+    profile = ' '.join(synthetic_field_texts(1, seed=1)['description'])
+    print(f"{'jobs':>10} {'engine':<8} {'step':<22} {'ms':>9}")
+    for n_jobs in args.sizes:
+        for engine in args.engines:
+            recommender = fitted_synthetic_recommender(n_jobs, engine)
+            directory = tempfile.mkdtemp()
+            path = os.path.join(directory, 'model')
+            try:
+                started = time.perf_counter()
+                recommender.save(path)
+                steps = [('save', time.perf_counter() - started)]
+                
+                for mmap in (True, False):
+                    started = time.perf_counter()
+                    loaded = JobRecommender.load(path, mmap=mmap)
+                    loaded_at = time.perf_counter()
+                    loaded.recommend_for_vector(loaded.vectorizer.transform_query([profile]), args.top_n)
+                    label = 'mmap' if mmap else 'read'
+                    steps += [(f"load ({label})", loaded_at - started),
+                              (f"first query ({label})", time.perf_counter() - loaded_at)]
+                
+                for step, elapsed in steps:
+                    print(f"{n_jobs:>10} {engine:<8} {step:<22} {elapsed * 1000:>9.1f}")
+            finally:
+                shutil.rmtree(directory)
+
+def synthetic_job_frame(n_jobs, seed=0):
+    """Job frame as JobRecommender used to keep it: raw fields, metadata and *_processed text"""
+    rng = np.random.default_rng(seed)
+    raw = synthetic_job_rows(n_jobs, seed=seed)
+    processed = synthetic_field_texts(n_jobs, seed=seed)
+    job_df = pd.DataFrame(raw, columns=list(TEXT_FIELDS))
+    job_df.insert(0, 'id', np.arange(1, n_jobs + 1))
+    job_df['subcategory'] = job_df['category']
+    job_df['location'] = [f"City {i}" for i in rng.integers(200, size=n_jobs)]
+    job_df['company_name'] = [f"Company {i}" for i in rng.integers(5000, size=n_jobs)]
+    job_df['job_type'] = rng.choice(['Full-time', 'Part-time', 'Contract', 'Internship'], n_jobs)
+    job_df['salary'] = [f"R{low}k - R{low + 10}k" for low in rng.integers(10, 60, size=n_jobs)]
+    job_df['salary_min'] = rng.integers(10, 60, size=n_jobs) * 1000
+    job_df['salary_max'] = job_df['salary_min'] + 10000
+    job_df['is_active'] = True
+    for field in TEXT_FIELDS:
+        job_df[f"{field}_processed"] = processed[field]
+    return job_df
+
+def bench_memory(args):
+    """Resident bytes of the per-job metadata: pandas frame with text vs JobStore arrays"""
+    print(f"{'jobs':>10} {'DataFrame MB':>13} {'JobStore MB':>12} {'matrix MB':>10} {'saved':>7}")
+    for n_jobs in args.sizes:
+        job_df = synthetic_job_frame(n_jobs)
+        frame_bytes = job_df.memory_usage(deep=True).sum()
+        store = JobStore.from_frame(job_df)
+        matrix = synthetic_job_matrix(n_jobs)
+        matrix_bytes = matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+        
+        # Both layouts hold the same TF-IDF matrix next to the metadata
+        before, after = frame_bytes + matrix_bytes, store.nbytes + matrix_bytes
+        print(f"{n_jobs:>10} {frame_bytes / 2**20:>13.1f} {store.nbytes / 2**20:>12.2f}"
+              f" {matrix_bytes / 2**20:>10.1f} {1 - after / before:>7.1%}")
+
+def seed_job_database(db, n_jobs, jobs_per_company=20, seed=0):
+    """Insert synthetic companies and active postings with bulk Core inserts"""
+    from sqlalchemy import insert
+    from app.models import Company, JobPosting, User
+    
+    job_df = synthetic_job_frame(n_jobs, seed=seed)
+    n_companies = max(1, n_jobs // jobs_per_company)
+    db.session.execute(insert(User.__table__), [
+        {'id': i, 'email': f"company{i}@example.com", 'password': 'x', 'user_type': 'company'}
+        for i in range(1, n_companies + 1)
+    ])
+    db.session.execute(insert(Company.__table__), [
+        {'id': i, 'name': f"Company {i}"} for i in range(1, n_companies + 1)
+    ])
+    columns = ['id', 'title', 'description', 'category', 'subcategory', 'role', 'location',
+               'qualification', 'salary', 'salary_min', 'salary_max', 'job_type', 'is_active']
+    rows = job_df[columns].to_dict('records')
+    for i, row in enumerate(rows):
+        row['company_id'] = i % n_companies + 1
+        row['salary_min'], row['salary_max'] = int(row['salary_min']), int(row['salary_max'])
+    db.session.execute(insert(JobPosting.__table__), rows)
+    db.session.commit()
+
+def bench_load(args):
+    """Corpus load time: ORM objects + company lazy loads vs one projected, streamed query"""
+    from sqlalchemy import event
+    from config import Config
+    from app import create_app, db
+    from app.models import JobPosting
+    from app.recommender_service import load_active_jobs
+    
+    print(f"{'jobs':>10} {'loader':<24} {'seconds':>9} {'queries':>8}")
+    for n_jobs in args.sizes:
+        directory = tempfile.mkdtemp()
+        try:
+            class BenchConfig(Config):
+                SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(directory, 'jobs.db')}"
+                SQLALCHEMY_ENGINE_OPTIONS = {}
+            
+            app = create_app(BenchConfig)
+            with app.app_context():
+                db.create_all()
+                seed_job_database(db, n_jobs)
+                
+                statements = []
+                def count_statement(*_):
+                    statements.append(1)
+                event.listen(db.engine, 'before_cursor_execute', count_statement)
+                
+                def orm_rows():
+                    jobs = JobPosting.query.filter_by(is_active=True).all()
+                    return JobRecommender().prepare_job_frame(jobs)
+                
+                def projected():
+                    return JobRecommender().prepare_job_frame(load_active_jobs(args.batch_size))
+                
+                frames = {}
+                for name, loader in [('ORM + to_recommender_row', orm_rows), ('projected yield_per', projected)]:
+                    # Fresh session each run so no identity map or loaded company is reused
+                    db.session.remove()
+                    statements.clear()
+                    started = time.perf_counter()
+                    frames[name] = loader()
+                    elapsed = time.perf_counter() - started
+                    print(f"{n_jobs:>10} {name:<24} {elapsed:>9.2f} {len(statements):>8}")
+                
+                event.remove(db.engine, 'before_cursor_execute', count_statement)
+                expected, actual = frames.values()
+                if not expected.equals(actual[expected.columns]):
+                    raise AssertionError("projected loader returned different job rows")
+                db.session.remove()
+                db.engine.dispose()
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+def synthetic_job_chunks(n_jobs, chunk_size):
+    """Synthetic job frames of chunk_size rows, generated as they are consumed"""
+    for start in range(0, n_jobs, chunk_size):
+        rows = synthetic_job_rows(min(chunk_size, n_jobs - start), seed=start)
+        job_df = pd.DataFrame(rows, columns=list(TEXT_FIELDS))
+        job_df.insert(0, 'id', np.arange(start + 1, start + len(job_df) + 1))
+        yield job_df
+
+def bench_stream(args):
+    """Peak traced memory and wall time of fit() vs the two-pass fit_stream()"""
+    print(f"{'jobs':>10} {'fit':<12} {'seconds':>9} {'peak MB':>9} {'matrix MB':>10}")
+    for n_jobs in args.sizes:
+        def in_memory():
+            job_df = pd.concat(synthetic_job_chunks(n_jobs, args.chunk_size), ignore_index=True)
+            return JobRecommender().fit(job_df, n_jobs=args.workers)
+        
+        def streaming():
+            return JobRecommender().fit_stream(synthetic_job_chunks(n_jobs, args.chunk_size), n_jobs=args.workers)
+        
+        matrices = []
+        for name, fit in [('fit', in_memory), ('fit_stream', streaming)]:
+            tracemalloc.start()
+            started = time.perf_counter()
+            matrix = fit().tfidf_matrix
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            matrices.append(matrix)
+            matrix_bytes = matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+            print(f"{n_jobs:>10} {name:<12} {elapsed:>9.1f} {peak / 2**20:>9.1f} {matrix_bytes / 2**20:>10.1f}")
+        
+        if abs(matrices[0] - matrices[1]).max() > 1e-9:
+            raise AssertionError("fit_stream() produced a different matrix")
+
+def add_index_arguments(subparser):
+    subparser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    subparser.add_argument('--queries', type=int, default=200)
+    subparser.add_argument('--features', type=int, default=10000)
+    subparser.add_argument('--terms', type=int, default=100, help='non-zero terms per job row')
+    subparser.add_argument('--top-n', type=int, default=10)
+
+def main():
+    parser = argparse.ArgumentParser(description='Recommender micro-benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    query = subparsers.add_parser('query', help=bench_query.__doc__)
+    add_index_arguments(query)
+    query.set_defaults(func=bench_query)
+    
+    retrieval = subparsers.add_parser('retrieval', help=bench_retrieval.__doc__)
+    add_index_arguments(retrieval)
+    retrieval.set_defaults(func=bench_retrieval)
+
+    preprocess = subparsers.add_parser('preprocess', help=bench_preprocess.__doc__)
+    preprocess.add_argument('--jobs', type=int, default=20000)
+    preprocess.add_argument('--workers', type=int, nargs='+',
+                            default=sorted({1, 2, 4, 8, 16, os.cpu_count() or 1}))
+    preprocess.set_defaults(func=bench_preprocess)
+
+    engines = subparsers.add_parser('engines', help=bench_engines.__doc__)
+    engines.add_argument('--jobs', type=int, default=20000)
+    engines.add_argument('--queries', type=int, default=200)
+    engines.add_argument('--bits', type=int, nargs='+', default=[16, 18, 20], help='log2 hashed columns per field')
+    engines.add_argument('--top-n', type=int, default=10)
+    engines.set_defaults(func=bench_engines)
+
+    artifacts = subparsers.add_parser('artifacts', help=bench_artifacts.__doc__)
+    artifacts.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    artifacts.add_argument('--engines', nargs='+', default=['tfidf', 'hashing'])
+    artifacts.add_argument('--top-n', type=int, default=10)
+    artifacts.set_defaults(func=bench_artifacts)
+
+    memory = subparsers.add_parser('memory', help=bench_memory.__doc__)
+    memory.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    memory.set_defaults(func=bench_memory)
+
+    load = subparsers.add_parser('load', help=bench_load.__doc__)
+    load.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    load.add_argument('--batch-size', type=int, default=5000)
+    load.set_defaults(func=bench_load)
+
+    stream = subparsers.add_parser('stream', help=bench_stream.__doc__)
+    stream.add_argument('--sizes', type=int, nargs='+', default=[20000, 100000])
+    stream.add_argument('--chunk-size', type=int, default=5000)
+    stream.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    stream.set_defaults(func=bench_stream)
+
+    lsa = subparsers.add_parser('lsa', help=bench_lsa.__doc__)
+    lsa.add_argument('--sizes', type=int, nargs='+', default=[20000, 100000])
+    lsa.add_argument('--components', type=int, nargs='+', default=[128, 256])
+    lsa.add_argument('--queries', type=int, default=200)
+    lsa.add_argument('--top-n', type=int, default=10)
+    lsa.set_defaults(func=bench_lsa)
+
+    compact = subparsers.add_parser('compact', help=bench_compact.__doc__)
+    compact.add_argument('--sizes', type=int, nargs='+', default=[20000, 100000])
+    compact.add_argument('--max-terms', type=int, nargs='+', default=[64, 32])
+    compact.add_argument('--queries', type=int, default=200)
+    compact.add_argument('--top-n', type=int, default=10)
+    compact.set_defaults(func=bench_compact)
+
+    candidates = subparsers.add_parser('candidates', help=bench_candidates.__doc__)
+    add_index_arguments(candidates)
+    candidates.set_defaults(func=bench_candidates, sizes=[1000, 10000, 50000])
+
+    neighbors = subparsers.add_parser('neighbors', help=bench_neighbors.__doc__)
+    add_index_arguments(neighbors)
+    neighbors.set_defaults(func=bench_neighbors, sizes=[10000, 50000])
+
+    filters = subparsers.add_parser('filters', help=bench_filters.__doc__)
+    add_index_arguments(filters)
+    filters.set_defaults(func=bench_filters, sizes=[100000, 1000000])
+
+    coapply = subparsers.add_parser('coapply', help=bench_coapply.__doc__)
+    coapply.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    coapply.add_argument('--jobs', type=int, default=100000)
+    coapply.add_argument('--per-graduate', type=int, default=5, help='mean applications per graduate')
+    coapply.set_defaults(func=bench_coapply)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == '__main__':
+    main()
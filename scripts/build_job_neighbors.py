@@ -0,0 +1,34 @@
+"""
+Similar jobs build
+Run this script to recompute the precomputed similar jobs (job_neighbors table)
+of every active posting in bulk, e.g. after a deploy or a bulk import, and on
+a schedule: edits made through the app refresh only the neighbor lists they
+touch, and skip that when the worker has no current model or too many lists change
+"""
+import os
+import sys
+import argparse
+import time
+
+# Add the parent directory to the path so we can import our app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.recommender_service import JOB_NEIGHBORS, refresh_job_neighbors
+from config import Config
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the similar jobs table for all postings')
+    parser.add_argument('--k', type=int, default=JOB_NEIGHBORS, help='similar jobs stored per posting')
+    parser.add_argument('--batch-size', type=int, default=10000, help='rows per bulk insert')
+    args = parser.parse_args()
+    
+    app = create_app(Config)
+    with app.app_context():
+        started = time.perf_counter()
+        written = refresh_job_neighbors(k=args.k, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - started
+        print(f"Stored {written} similar jobs in {elapsed:.1f}s")
+
+if __name__ == '__main__':
+    main()
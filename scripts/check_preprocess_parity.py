@@ -0,0 +1,98 @@
+"""
+Preprocessing parity check
+Run this script to verify that the compiled TextNormalizer produces exactly the
+same output as the original NLTK preprocessing pipeline, on a set of tricky
+strings and on every job posting in the database
+"""
+import os
+import re
+import sys
+
+# Add the parent directory to the path so we can import our app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nltk.corpus import stopwords
+from nltk.tokenize import word_tokenize
+from nltk.stem import WordNetLemmatizer
+
+from app.text_processing import get_normalizer
+
+SAMPLES = [
+    '',
+    'Senior Software Engineer (Python/Django) - 3+ years',
+    'Send your CV to hr@example.com or visit https://careers.example.com/jobs?id=42',
+    'contact:foo@http://example.com www.example.org/apply user@www.example.com',
+    'We cannot promise, but you gonna love it. Wanna join? Gimme, lemme, gotta!',
+    'CANNOT GONNA Wanna cannot-do gımme',
+    'Café développeur über naïve résumé — Kuala Lumpur, Penang & Johor Bahru',
+    'RM 4,000 - RM 6,500 / month; 2nd-year students; C++ C# .NET Node.js',
+    'Responsibilities:\n\t* Analyse data\n\t* Build dashboards\r\n* Present findings...',
+    'e-mail: a@b@c.com, a@@b, @handle, trailing@ , x@y',
+    'under_score snake_case_words attorneys_general 3D 2x faster',
+]
+
+def legacy_preprocess_text(text):
+    """The original JobRecommender.preprocess_text implementation"""
+    if not isinstance(text, str):
+        return ''
+
+    text = text.lower()
+    text = re.sub(r'http\S+|www\S+|https\S+', ' ', text)
+    text = re.sub(r'\S+@\S+', ' ', text)
+    text = re.sub(r'[^\w\s]', ' ', text)
+    text = re.sub(r'\d+', ' ', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+
+    tokens = word_tokenize(text)
+
+    stop_words = set(stopwords.words('english'))
+    custom_stopwords = {'job', 'work', 'company', 'position', 'required', 'requirements',
+                        'experience', 'skill', 'skills', 'candidate', 'opportunity', 'role'}
+    stop_words.update(custom_stopwords)
+    tokens = [word for word in tokens if word not in stop_words]
+
+    lemmatizer = WordNetLemmatizer()
+    tokens = [lemmatizer.lemmatize(word) for word in tokens]
+
+    tokens = [word for word in tokens if len(word) >= 3]
+
+    return ' '.join(tokens)
+
+def database_texts():
+    """Yield every text field the recommender preprocesses from the database"""
+    try:
+        from app import create_app
+        from app.models import JobPosting, Graduate
+        from config import Config
+    except ImportError as e:
+        print(f"Skipping database texts: {e}")
+        return
+
+    app = create_app(Config)
+    with app.app_context():
+        for job in JobPosting.query.all():
+            yield from (job.title, job.description, job.category, job.role, job.qualification)
+        for graduate in Graduate.query.all():
+            yield f"{graduate.skills} {graduate.experience} {graduate.location_preference}"
+
+def check_parity(texts):
+    """Compare both pipelines and return the number of mismatches"""
+    normalize_text = get_normalizer()
+    checked = mismatches = 0
+
+    for text in texts:
+        expected = legacy_preprocess_text(text)
+        actual = normalize_text(text)
+        checked += 1
+        if expected != actual:
+            mismatches += 1
+            print(f"MISMATCH for {text!r}\n  legacy:     {expected!r}\n  normalizer: {actual!r}")
+
+    print(f"Checked {checked} texts, {mismatches} mismatches")
+    return mismatches
+
+if __name__ == '__main__':
+    texts = list(SAMPLES)
+    if '--no-db' not in sys.argv:
+        texts.extend(database_texts())
+    sys.exit(1 if check_parity(texts) else 0)
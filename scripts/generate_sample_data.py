@@ -11,7 +11,8 @@ from datetime import datetime, timedelta
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app import create_app, db, bcrypt
-from app.models import User, Admin, Graduate, Company, JobPosting, Application
+from app.models import User, Admin, Graduate, Company, JobPosting, Application, ProcessedJobText
+from app.recommender_service import notify_jobs_changed
 from config import Config
 
 app = create_app(Config)
@@ -22,6 +23,7 @@ def generate_sample_data():
         # Clear existing data
         print("Clearing existing data...")
         Application.query.delete()
+        ProcessedJobText.query.delete()
         JobPosting.query.delete()
         db.session.commit()
         
@@ -273,6 +275,8 @@ def generate_sample_data():
             
             db.session.add(job)
         
+        # Let running workers know the job corpus changed
+        notify_jobs_changed()
         db.session.commit()
         job_postings = JobPosting.query.all()
         
@@ -0,0 +1,91 @@
+"""
+Import-time budget check
+Run this script to measure how long `create_app()` takes in a fresh interpreter,
+using `python -X importtime`, and to check that it stays within budget and does
+not import the recommendation engine's heavy dependencies
+(e.g. `python scripts/measure_import_time.py --budget-ms 1500 --top 15`)
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+# Project root, where app/ and config.py live
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be imported once a recommender is actually used
+LAZY_MODULES = ['nltk', 'sklearn', 'pandas', 'matplotlib', 'app.recommender']
+
+# Builds the app against an in-memory SQLite database and prints the wall time
+STARTUP_CODE = """
+import time
+started = time.perf_counter()
+from config import Config
+from app import create_app
+class MeasureConfig(Config):
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+create_app(MeasureConfig)
+print(f"create_app_ms={(time.perf_counter() - started) * 1000:.1f}")
+"""
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us)] from `-X importtime` output
+
+    Nested imports keep their indentation (two spaces per level) in module.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        imports.append((module[1:].rstrip(), int(self_us), int(cumulative_us)))
+    return imports
+
+def measure():
+    """Run the startup code in a fresh interpreter; return (wall ms, imports)"""
+    env = dict(os.environ, DATABASE_URI='sqlite://')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        raise SystemExit(f"create_app() failed with exit code {result.returncode}")
+
+    wall_ms = None
+    for line in result.stdout.splitlines():
+        if line.startswith('create_app_ms='):
+            wall_ms = float(line.split('=', 1)[1])
+    return wall_ms, parse_importtime(result.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure create_app() import time against a budget')
+    parser.add_argument('--budget-ms', type=float, default=1500, help='maximum create_app() wall time')
+    parser.add_argument('--top', type=int, default=15, help='slowest imports (by self time) to list')
+    parser.add_argument('--runs', type=int, default=3, help='fresh interpreters to measure (best run counts)')
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    wall_ms, imports = min(runs, key=lambda run: run[0])
+
+    print(f"{'self ms':>8} {'cumulative ms':>14}  module")
+    for module, self_us, cumulative_us in sorted(imports, key=lambda entry: -entry[1])[:args.top]:
+        print(f"{self_us / 1000:>8.1f} {cumulative_us / 1000:>14.1f}  {module.strip()}")
+
+    imported = {module.strip() for module, _, _ in imports}
+    eager = [name for name in LAZY_MODULES if name in imported]
+
+    print(f"\ncreate_app() wall time: {wall_ms:.1f} ms (budget {args.budget_ms:.0f} ms, best of {args.runs})")
+    failed = False
+    if wall_ms > args.budget_ms:
+        print("FAIL: over budget")
+        failed = True
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
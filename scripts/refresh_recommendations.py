@@ -0,0 +1,38 @@
+"""
+Nightly recommendation refresh
+Run this script to recompute stored job recommendations for every graduate
+in bulk, using batched sparse scoring instead of the per-user path
+"""
+import os
+import sys
+import argparse
+import time
+
+# Add the parent directory to the path so we can import our app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.recommender_service import refresh_all_recommendations
+from config import Config
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh job recommendations for all graduates')
+    parser.add_argument('--top-n', type=int, default=10, help='recommendations stored per graduate')
+    parser.add_argument('--batch-size', type=int, default=2000, help='graduates loaded and written per transaction')
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help='profiles per sparse product (default: sized to bound memory)')
+    args = parser.parse_args()
+    
+    app = create_app(Config)
+    with app.app_context():
+        started = time.perf_counter()
+        refreshed, written, cleared = refresh_all_recommendations(
+            top_n=args.top_n,
+            batch_size=args.batch_size,
+            chunk_size=args.chunk_size
+        )
+        elapsed = time.perf_counter() - started
+        print(f"Refreshed {refreshed} graduates ({written} recommendations), cleared {cleared} in {elapsed:.1f}s")
+
+if __name__ == '__main__':
+    main()